@@ -1,9 +1,15 @@
 #!/bin/bash
 # Local build script for Hive City Rampage
 # Tests PyInstaller build before pushing to CI/CD
+# Usage: ./build.sh [--onedir]   (--onedir: startup-optimized folder build)
 
 set -e  # Exit on error
 
+SPEC="hive_city_rampage.spec"
+if [ "$1" = "--onedir" ]; then
+    SPEC="hive_city_rampage_onedir.spec"
+fi
+
 echo "🔨 Building Hive City Rampage..."
 echo ""
 
@@ -19,18 +25,24 @@ source .venv/bin/activate
 # Install/upgrade dependencies
 echo "📦 Installing dependencies..."
 pip install --upgrade pip
-pip install "pygame>=2.6.0" "pyinstaller>=6.0.0"
+pip install "pygame>=2.6.0" "pyinstaller>=6.6.0"
 
 # Clean previous builds
 echo "🧹 Cleaning previous builds..."
 rm -rf build/ dist/
 
+# Pre-decode sprites for the startup-optimized build
+if [ "$SPEC" = "hive_city_rampage_onedir.spec" ]; then
+    echo "🖼️  Building sprite pack..."
+    SDL_VIDEODRIVER=dummy python src/pyg/assetpack.py
+fi
+
 # Run PyInstaller
 echo "⚙️  Running PyInstaller..."
-pyinstaller hive_city_rampage.spec
+pyinstaller "$SPEC"
 
 # Check if build succeeded
-if [ -f "dist/HiveCityRampage" ] || [ -d "dist/HiveCityRampage.app" ] || [ -f "dist/HiveCityRampage.exe" ]; then
+if [ -e "dist/HiveCityRampage" ] || [ -d "dist/HiveCityRampage.app" ] || [ -f "dist/HiveCityRampage.exe" ]; then
     echo ""
     echo "✅ Build successful!"
     echo ""
@@ -42,6 +54,8 @@ if [ -f "dist/HiveCityRampage" ] || [ -d "dist/HiveCityRampage.app" ] || [ -f "d
         echo "   open dist/HiveCityRampage.app"
     elif [ -f "dist/HiveCityRampage.exe" ]; then
         echo "   dist/HiveCityRampage.exe"
+    elif [ -d "dist/HiveCityRampage" ]; then
+        echo "   dist/HiveCityRampage/HiveCityRampage"
     else
         echo "   cd dist && ./HiveCityRampage"
     fi
@@ -0,0 +1,99 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+PyInstaller spec file for Hive City Rampage, startup-optimized
+Onedir build: nothing to unpack at launch, bytecode compiled at build time, runtime assets only (pre-decoded)
+"""
+
+import sys
+from pathlib import Path
+
+block_cipher = None
+
+# Define paths
+src_path = Path('src/pyg')
+assets_path = src_path / 'assets'
+
+# Assets the game loads at runtime, the same list the sprite pack is built from
+sys.path.insert(0, str(src_path))
+from constants import SPRITE_PACK
+from assetpack import open_pack, missing_from_pack, runtime_assets
+
+asset_files = [(str(assets_path / name), 'assets') for name in runtime_assets(assets_path)]
+
+# With a sprite pack (build.sh makes one) the pre-decoded pixels ship instead of the PNGs,
+# so every runtime image has to be in it and current
+pack_path = assets_path / SPRITE_PACK
+if pack_path.exists():
+    pack = open_pack(str(pack_path))
+    missing = missing_from_pack(pack, str(assets_path)) if pack else ['(unreadable pack)']
+    if missing:
+        raise SystemExit(f"{pack_path} is missing or has stale copies of {', '.join(missing)}; "
+                         f"rebuild it with python src/pyg/assetpack.py")
+    asset_files = [(str(pack_path), 'assets')]
+
+# Multiprocessing: the prefetcher and SIM_PROCESS spawn this same executable.
+# PyInstaller's multiprocessing runtime hook plus freeze_support() at the top
+# of the entry script's __main__ block turn those launches into workers.
+a = Analysis(
+    # Only the entry script: every game module it imports is found from there
+    [str(src_path / 'hive_city_rampage.py')],
+    pathex=[str(src_path)],
+    binaries=[],
+    datas=asset_files,
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    # pkg_resources is only pygame.pkgdata's first choice and costs ~90 ms to
+    # import; pygame falls back to plain file access without it
+    excludes=['pkg_resources', 'setuptools', 'tkinter', 'unittest', 'pydoc', 'hive_city_rampage_backup'],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+    optimize=1,  # modules are byte-compiled here (asserts stripped), never on a player's machine
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,  # binaries and data go next to the executable (COLLECT below)
+    name='HiveCityRampage',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,  # compressed libraries would have to be unpacked on every launch
+    console=False,  # Set to False for windowed app (no console)
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None,  # Add icon path here if you create one: 'assets/icon.ico'
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='HiveCityRampage',
+)
+
+# macOS app bundle
+if sys.platform == 'darwin':
+    app = BUNDLE(
+        coll,
+        name='HiveCityRampage.app',
+        icon=None,  # Add icon path here: 'assets/icon.icns'
+        bundle_identifier='com.hivecityrampage.game',
+        info_plist={
+            'NSPrincipalClass': 'NSApplication',
+            'NSHighResolutionCapable': 'True',
+        },
+    )
@@ -3,18 +3,19 @@ AI and targeting system for Hive City Rampage
 Aim assist and enemy behavior utilities
 """
 
-from constants import AIM_RANGE, AIM_CONE
+from constants import AIM_RANGE, AIM_CONE, AIM_SMOOTH, AIM_HOLD_FR, AIM_PULL, AIM_EVAL_BUDGET
 from utils import norm
 
 
-def pick_aim_target(player, enemies, rng=AIM_RANGE, cone=AIM_CONE):
+def pick_aim_target(player, enemies, rng=AIM_RANGE, cone=AIM_CONE, face=None):
     """
     Select best enemy target within range and cone
     Prioritizes enemies in front of player with type weighting
+    (face: cone direction, default player.face)
     """
     best = None
     bestscore = -1e9
-    fx, fy = player.face
+    fx, fy = face or player.face
 
     for e in enemies:
         dx, dy = e.x - player.x, e.y - player.y
@@ -37,4 +38,44 @@ def pick_aim_target(player, enemies, rng=AIM_RANGE, cone=AIM_CONE):
                     bestscore = score
                     best = e
 
-    return best
\ No newline at end of file
+    return best
+
+
+def assist_aim(player, grid, ux, uy):
+    """
+    Bend the pointer direction (ux, uy) toward an enemy in the aim cone
+    The target sticks for AIM_HOLD_FR frames while it stays in range and
+    cone; otherwise up to AIM_EVAL_BUDGET nearby enemies from a cone query
+    on grid (a SpatialGrid of the enemies) are scored, so the cost doesn't
+    depend on how many enemies there are. The pull eases in and out by
+    AIM_SMOOTH per frame. Returns the aim.
+    """
+    tgt = player.aim_tgt
+    if tgt is not None:
+        dx, dy = tgt.x - player.x, tgt.y - player.y
+        tx, ty, d = norm(dx, dy)
+        if tgt.hp <= 0 or d > AIM_RANGE or tx*ux + ty*uy < 1 - AIM_CONE:
+            tgt = None
+        elif player.aim_hold > 0:
+            player.aim_hold -= 1
+        else:
+            tgt = None  # hold expired: look again (it can win again)
+
+    if tgt is None:
+        candidates = grid.query_cone(player.x, player.y, ux, uy, AIM_RANGE, 1 - AIM_CONE, AIM_EVAL_BUDGET)
+        tgt = pick_aim_target(player, candidates, face=(ux, uy))
+        if tgt is not None:
+            player.aim_hold = AIM_HOLD_FR
+    player.aim_tgt = tgt
+
+    # Offset from the pointer toward the target, smoothed so it doesn't snap
+    gx = gy = 0.0
+    if tgt is not None:
+        tx, ty, _ = norm(tgt.x - player.x, tgt.y - player.y)
+        gx, gy = (tx - ux) * AIM_PULL, (ty - uy) * AIM_PULL
+    ox, oy = player.aim_off
+    ox += (gx - ox) * AIM_SMOOTH
+    oy += (gy - oy) * AIM_SMOOTH
+    player.aim_off = (ox, oy)
+    ax, ay, _ = norm(ux + ox, uy + oy)
+    return ax, ay
\ No newline at end of file
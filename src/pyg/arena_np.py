@@ -0,0 +1,312 @@
+"""
+Vectorized arena generation for Hive City Rampage
+NumPy version of Arena's generator: slicing for corridors/rooms, shifted sums for masks
+"""
+
+import numpy as np
+
+from world import Arena, HALL_WIDTH, ROOM_SPACING_X, ROOM_SPACING_Y, LINK_CORRIDORS
+from world import PROP_ROOM_TYPES, CORRIDOR_PROPS, STORAGE_PROPS, DECAL_TYPES, HAZARD_TYPES, ANIM_TILE_TYPES
+from tracing import span
+
+
+def _shift(a, dy, dx):
+    """a shifted so out[y, x] = a[y+dy, x+dx], zero-filled past the edges"""
+    h, w = a.shape
+    out = np.zeros_like(a)
+    out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = \
+        a[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+    return out
+
+
+def _pick(rng, choices, n):
+    """n uniform picks from a list of strings"""
+    return [choices[i] for i in rng.integers(0, len(choices), n).tolist()]
+
+
+# Sparse per-tile layers returned by scatter_layers as (ys, xs, values)
+SPARSE_LAYERS = ("wall_elements", "tile_decals", "hazard_tiles", "animated_tiles")
+
+
+def room_props(solid, room, room_type, rng, props, ox=0, oy=0):
+    """Place the props of one room
+
+    solid is a window of the map whose [0, 0] is tile (ox, oy); room and the
+    keys written to props are in map tile coordinates.
+    """
+    rx, ry, rw, rh = room
+    if rw < 5 or rh < 4:
+        return
+    h, w = solid.shape
+
+    def floor_at(xs, y):
+        return solid[y - oy, xs - ox] == 0
+
+    # Clip the room interior to the window so slices stay in bounds
+    xs = np.arange(rx, rx + rw)
+    xs = xs[(xs >= ox) & (xs < ox + w)]
+
+    if room_type == 'command':
+        top = xs[(xs >= rx + 2) & (xs < rx + rw - 2) & ((xs - rx - 2) % 3 == 0)]
+        if oy < ry < oy + h:
+            for x in top[floor_at(top, ry) & ~floor_at(top, ry - 1)].tolist():
+                props[(x, ry)] = 'computer_n'
+        by = ry + rh - 1
+        if by + 1 < oy + h:
+            for x in top[floor_at(top, by) & ~floor_at(top, by + 1)].tolist():
+                props[(x, by)] = 'computer_s'
+        if rw >= 8 and rh >= 6:
+            hx, hy = rx + rw//2, ry + rh//2
+            if solid[hy - oy, hx - ox] == 0:
+                props[(hx, hy)] = 'holotable'
+
+    elif room_type == 'storage':
+        sy = np.arange(ry + 1, min(ry + rh - 1, oy + h), 2)
+        sx = xs[(xs >= rx + 1) & (xs < rx + rw - 1) & ((xs - rx - 1) % 3 == 0)]
+        if len(sy) and len(sx):
+            gy, gx = np.meshgrid(sy, sx, indexing="ij")
+            ok = (solid[gy - oy, gx - ox] == 0) & (rng.random(gy.shape) < 0.6)
+            picks = _pick(rng, STORAGE_PROPS, int(ok.sum()))
+            for x, y, p in zip(gx[ok].tolist(), gy[ok].tolist(), picks):
+                props[(x, y)] = p
+
+    elif room_type == 'armory':
+        ax = xs[(xs >= rx + 1) & (xs < rx + rw - 1) & ((xs - rx - 1) % 2 == 0)]
+        if ry + 1 < oy + h:
+            for x in ax[floor_at(ax, ry + 1) & (rng.random(len(ax)) < 0.7)].tolist():
+                props[(x, ry + 1)] = 'ammo_crate'
+        if ry + rh - 2 < oy + h:
+            for x in ax[floor_at(ax, ry + rh - 2) & (rng.random(len(ax)) < 0.5)].tolist():
+                props[(x, ry + rh - 2)] = 'weapon_rack'
+
+    elif room_type == 'machinery':
+        for px, py in ((rx + 1, ry + 1), (rx + rw - 2, ry + 1),
+                       (rx + 1, ry + rh - 2), (rx + rw - 2, ry + rh - 2)):
+            if oy <= py < oy + h and ox <= px < ox + w and solid[py - oy, px - ox] == 0:
+                props[(px, py)] = 'column'
+        if rw >= 6 and rh >= 5:
+            mx, my = rx + rw//2, ry + rh//2
+            if solid[my - oy, mx - ox] == 0:
+                props[(mx, my)] = 'generator'
+
+
+def corridor_prop_mask(solid, rng):
+    """Tiles that get a corridor prop: floor with <= 2 floor neighbors, 2% chance"""
+    floor = solid == 0
+    f = floor.astype(np.uint8)
+    nb = _shift(f, -1, 0) + _shift(f, 1, 0) + _shift(f, 0, -1) + _shift(f, 0, 1)
+    cand = floor & (nb <= 2) & (rng.random(solid.shape) < 0.02)
+    cand[0, :] = cand[-1, :] = cand[:, 0] = cand[:, -1] = False
+    return cand
+
+
+def tile_masks(solid):
+    """Interior-wall flags plus cardinal (N=1,E=2,S=4,W=8) and diagonal (NW=1,NE=2,SW=4,SE=8) floor masks"""
+    f = (solid == 0).astype(np.uint8)
+    n, e, s, wst = _shift(f, -1, 0), _shift(f, 0, 1), _shift(f, 1, 0), _shift(f, 0, -1)
+    nw, ne, sw, se = _shift(f, -1, -1), _shift(f, -1, 1), _shift(f, 1, -1), _shift(f, 1, 1)
+    interior = (solid == 1) & ((n + e + s + wst + nw + ne + sw + se) == 0)
+    return interior, n | (e << 1) | (s << 2) | (wst << 3), nw | (ne << 1) | (sw << 2) | (se << 3)
+
+
+def scatter_layers(solid, interior, rng):
+    """Per-tile random layers: variant arrays, plus (ys, xs, values) for SPARSE_LAYERS"""
+    h, w = solid.shape
+    floor = solid == 0
+    out = {
+        "wall_variants": rng.integers(0, 8, (h, w)),
+        "floor_variants": rng.integers(0, 8, (h, w)),
+    }
+    ey, ex = np.nonzero((solid == 1) & ~interior & (rng.random((h, w)) < 0.08))
+    out["wall_elements"] = (ey, ex, rng.integers(0, 8, len(ex)).tolist())
+    for name, p, choices in (("tile_decals", 0.05, DECAL_TYPES),
+                             ("hazard_tiles", 0.02, HAZARD_TYPES),
+                             ("animated_tiles", 0.03, ANIM_TILE_TYPES)):
+        ty, tx = np.nonzero(floor & (rng.random((h, w)) < p))
+        out[name] = (ty, tx, _pick(rng, choices, len(tx)))
+    return out
+
+
+def floor_labels(solid):
+    """Connected floor components by vectorized union-find
+
+    Every floor tile starts as its own root; each round hooks the larger of
+    two touching roots under the smaller (np.minimum.at) and then compresses
+    paths by pointer jumping, until no edge joins two roots. Returns (flat
+    indexes of floor tiles, root index of each).
+    """
+    h, w = solid.shape
+    floor = (solid == 0).ravel()
+    n = np.arange(h * w)
+    right = floor[:-1] & floor[1:] & (n[:-1] % w != w - 1)
+    down = floor[:-w] & floor[w:]
+    a = np.concatenate((np.flatnonzero(right), np.flatnonzero(down)))
+    b = np.concatenate((np.flatnonzero(right) + 1, np.flatnonzero(down) + w))
+    lab = n.copy()
+    while True:
+        la, lb = lab[a], lab[b]
+        diff = la != lb
+        if not diff.any():
+            break
+        la, lb = la[diff], lb[diff]
+        low = np.minimum(la, lb)
+        np.minimum.at(lab, np.maximum(la, lb), low)
+        while True:
+            jumped = lab[lab]
+            if np.array_equal(jumped, lab):
+                break
+            lab = jumped
+        a, b = a[diff], b[diff]
+    idx = np.flatnonzero(floor)
+    return idx, lab[idx]
+
+
+class NumpyArena(Arena):
+    """Arena generated with NumPy
+
+    Same rules and probabilities as Arena, so layouts have the same
+    statistics, but draws come from a NumPy Generator and every per-tile pass
+    is an array operation. The layers are exported as the usual lists/dicts;
+    interior-wall and neighbor masks are precomputed so the per-tile render
+    queries become lookups. NumPy copies stay on the arena as *_np arrays.
+    """
+    def __init__(self, seed=None, w=None, h=None):
+        self.rng = np.random.default_rng(seed)
+        super().__init__(seed, w, h)
+
+    def _gen(self):
+        """Carve corridors, rooms and link corridors with array slicing"""
+        rng = self.rng
+        w, h = self.w, self.h
+        cx, cy = w//2, h//2
+        solid = np.ones((h, w), dtype=np.uint8)
+
+        # Corridor grid (one offset per grid line)
+        ys = np.arange(3, h - 3, ROOM_SPACING_Y) + rng.integers(-1, 2, len(range(3, h - 3, ROOM_SPACING_Y)))
+        for y in ys[(ys >= 3) & (ys <= h - 4)].tolist():
+            solid[y:y + HALL_WIDTH, 3:w - 3] = 0
+        xs = np.arange(4, w - 4, ROOM_SPACING_X) + rng.integers(-1, 2, len(range(4, w - 4, ROOM_SPACING_X)))
+        for x in xs[(xs >= 3) & (xs <= w - 5)].tolist():
+            solid[3:h - 3, x:x + HALL_WIDTH] = 0
+
+        # Rooms: all grid cells drawn at once, carved through a 2D difference array
+        gy, gx = np.meshgrid(np.arange(3, h - 8, ROOM_SPACING_Y), np.arange(4, w - 10, ROOM_SPACING_X), indexing="ij")
+        gy, gx = gy.ravel(), gx.ravel()
+        n = len(gx)
+        keep = rng.random(n) < 0.7
+        rw = rng.integers(6, 11, n)
+        rh = rng.integers(5, 9, n)
+        rx = gx + rng.integers(-2, 3, n)
+        ry = gy + rng.integers(-1, 2, n)
+        rx, ry, rw, rh = rx[keep], ry[keep], rw[keep], rh[keep]
+        x1 = np.minimum(rx + rw, w - 2)
+        y1 = np.minimum(ry + rh, h - 2)
+        diff = np.zeros((h + 1, w + 1), dtype=np.int32)
+        np.add.at(diff, (ry, rx), 1)
+        np.add.at(diff, (ry, x1), -1)
+        np.add.at(diff, (y1, rx), -1)
+        np.add.at(diff, (y1, x1), 1)
+        covered = diff.cumsum(0).cumsum(1)[:h, :w] > 0
+        solid[covered] = 0
+        self.rooms = list(zip(rx.tolist(), ry.tolist(), rw.tolist(), rh.tolist()))
+
+        # Central command room
+        solid[max(0, cy - 5):cy + 6, max(0, cx - 6):cx + 7] = 0
+        self.rooms.append((cx - 6, cy - 5, 13, 11))
+
+        # L-shaped link corridors between random room pairs
+        if len(self.rooms) >= 2:
+            pairs = rng.integers(0, len(self.rooms), (LINK_CORRIDORS, 2)).tolist()
+            for i1, i2 in pairs:
+                r1, r2 = self.rooms[i1], self.rooms[i2]
+                lx1, ly1 = r1[0] + r1[2]//2, r1[1] + r1[3]//2
+                lx2, ly2 = r2[0] + r2[2]//2, r2[1] + r2[3]//2
+                solid[max(2, ly1):min(h - 1, ly1 + HALL_WIDTH),
+                      max(0, min(lx1, lx2)):min(w, max(lx1, lx2) + 1)] = 0
+                solid[max(0, min(ly1, ly2)):min(h, max(ly1, ly2) + 1),
+                      max(2, lx2):min(w - 1, lx2 + HALL_WIDTH)] = 0
+
+        self.solid_np = solid
+        self.solid = solid.tolist()
+        self._ensure_connected()
+        with span("Arena._place_props", "arena"):
+            self._place_props()
+
+    def carve(self, tx, ty):
+        """Carve a floor tile in both the list and the NumPy grid"""
+        if 0 <= tx < self.w and 0 <= ty < self.h:
+            self.solid[ty][tx] = 0
+            self.solid_np[ty, tx] = 0
+
+    def _floor_components(self):
+        """Group 4-connected floor tiles: {root index: [tile index, ...]}"""
+        idx, roots = floor_labels(self.solid_np)
+        order = np.argsort(roots, kind="stable")
+        idx, roots = idx[order], roots[order]
+        starts = np.flatnonzero(np.r_[True, roots[1:] != roots[:-1]])
+        return dict(zip(roots[starts].tolist(), (part.tolist() for part in np.split(idx, starts[1:]))))
+
+    def _rebuild_floor(self):
+        """Rebuild list of floor tiles (same row-major order as Arena)"""
+        inner = self.solid_np[1:-1, 1:-1] == 0
+        fy, fx = np.nonzero(inner)
+        self.floor = list(zip((fx + 1).tolist(), (fy + 1).tolist()))
+
+    def _place_props(self):
+        """Place room props per room, corridor props as one masked draw"""
+        rng = self.rng
+        cx, cy = self.w//2, self.h//2
+        kinds = rng.integers(0, len(PROP_ROOM_TYPES), len(self.rooms)).tolist()
+        for room, kind in zip(self.rooms, kinds):
+            rx, ry, rw, rh = room
+            is_central = abs(rx + rw//2 - cx) < 8 and abs(ry + rh//2 - cy) < 6
+            room_props(self.solid_np, room, 'command' if is_central else PROP_ROOM_TYPES[kind], rng, self.props)
+
+        py, px = np.nonzero(corridor_prop_mask(self.solid_np, rng))
+        for x, y, p in zip(px.tolist(), py.tolist(), _pick(rng, CORRIDOR_PROPS, len(px))):
+            self.props.setdefault((x, y), p)
+
+    def _assign_variants(self):
+        """Variants, wall elements, decals, hazards and animated tiles as masked draws"""
+        # Masks the renderer would otherwise compute per tile per frame
+        self.interior_np, self.neighbor_mask_np, self.diagonal_mask_np = tile_masks(self.solid_np)
+        self.interior = self.interior_np.tolist()
+        self.neighbor_masks = self.neighbor_mask_np.tolist()
+        self.diagonal_masks = self.diagonal_mask_np.tolist()
+
+        layers = scatter_layers(self.solid_np, self.interior_np, self.rng)
+        self.wall_variants = layers["wall_variants"].tolist()
+        self.floor_variants = layers["floor_variants"].tolist()
+        for name in SPARSE_LAYERS:
+            ty, tx, values = layers[name]
+            getattr(self, name).update(zip(zip(tx.tolist(), ty.tolist()), values))
+
+    def get_neighbor_mask(self, tx, ty):
+        """Cardinal floor mask (N=1, E=2, S=4, W=8), precomputed"""
+        return self.neighbor_masks[ty][tx]
+
+    def get_diagonal_mask(self, tx, ty):
+        """Diagonal floor mask (NW=1, NE=2, SW=4, SE=8), precomputed"""
+        return self.diagonal_masks[ty][tx]
+
+    def is_interior_wall(self, tx, ty):
+        """Wall with no floor in its 8-neighborhood, precomputed"""
+        return self.interior[ty][tx]
+
+
+if __name__ == "__main__":
+    # Compare layout statistics and timings of both generators
+    import time
+    from world import layout_stats
+
+    for name, cls in (("python", Arena), ("numpy", NumpyArena)):
+        t0 = time.perf_counter()
+        stats = [layout_stats(cls(seed)) for seed in range(20)]
+        dt = (time.perf_counter() - t0) / len(stats)
+        print(f"{name:>6}: {dt*1000:7.1f} ms/arena")
+        for key in stats[0]:
+            print(f"        {key:<20}{sum(s[key] for s in stats) / len(stats):10.4f}")
+
+    t0 = time.perf_counter()
+    big = NumpyArena(0, 1000, 1000)
+    print(f"numpy 1000x1000: {time.perf_counter() - t0:.3f} s, {len(big.floor)} floor tiles")
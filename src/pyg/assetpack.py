@@ -0,0 +1,160 @@
+"""
+Sprite pack for Hive City Rampage
+Every PNG in the assets dir pre-decoded to raw pixels in one file, turned into surfaces straight from a memory map
+"""
+
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame as pg
+
+from constants import SPRITE_PACK
+
+
+MAGIC = b"HCRP"
+FORMAT_VERSION = 2
+# magic, format version, pixel format (pg.image.tobytes name), manifest length
+HEADER = struct.Struct("<4sH2x4sI")
+ALIGN = 16  # pixel blobs start on 16-byte boundaries
+# Byte order of the 32-bit ARGB surfaces SDL prefers, so packed images blit without conversion
+NATIVE_FORMAT = "BGRA" if sys.byteorder == "little" else "ARGB"
+
+# Images the game loads at runtime (file name patterns in the assets dir). The
+# pack and the onedir build both take this list, so the generator scripts,
+# source sheets and unused variants stay out of both. Add new art here too.
+RUNTIME_ASSETS = [
+    'marine_*.png', 'grunt_*.png', 'runner_*.png', 'shooter_*.png', 'brute_*.png',
+    'bullet_*.png', 'pickup_*.png', 'explosion.png', 'smoke.png', 'shockwave.png',
+    'terrain_interior.png', 'terrain_autotile.png', 'terrain_corners_outer.png',
+    'terrain_corners_inner.png', 'terrain_floors_v2.png', 'terrain_wall_elements.png',
+    'hazard_*.png', 'prop_*.png', 'anim_*.png', 'decal_*.png',
+]
+
+
+class PackFormatError(Exception):
+    """Raised for files that aren't a readable sprite pack"""
+
+
+def _digest(path):
+    """Content hash of a source file, as kept in the manifest"""
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _pad(n):
+    return (ALIGN - n % ALIGN) % ALIGN
+
+
+def runtime_assets(assets_dir):
+    """Names of the files in assets_dir that match RUNTIME_ASSETS, sorted"""
+    names = os.listdir(assets_dir)
+    return sorted({n for pattern in RUNTIME_ASSETS for n in fnmatch.filter(names, pattern)})
+
+
+def build_pack(assets_dir, out=None, pixel_format=NATIVE_FORMAT):
+    """Decode the runtime images in assets_dir into one pack file (default: SPRITE_PACK there)
+
+    The manifest maps file name -> [offset, w, h, source mtime, source size,
+    source hash]; offsets count from the first byte after the (padded)
+    manifest.
+    """
+    out = out or os.path.join(assets_dir, SPRITE_PACK)
+    entries, blobs, off = {}, [], 0
+    for name in runtime_assets(assets_dir):
+        path = os.path.join(assets_dir, name)
+        img = pg.image.load(path)
+        data = pg.image.tobytes(img, pixel_format)
+        st = os.stat(path)
+        entries[name] = [off, img.get_width(), img.get_height(), st.st_mtime, st.st_size, _digest(path)]
+        blobs += [data, b"\0" * _pad(len(data))]
+        off += len(data) + _pad(len(data))
+    manifest = json.dumps(entries).encode()
+    head = HEADER.pack(MAGIC, FORMAT_VERSION, pixel_format.encode(), len(manifest))
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(head + manifest + b"\0" * _pad(len(head) + len(manifest)))
+        f.writelines(blobs)
+    os.replace(tmp, out)
+    return out, len(entries)
+
+
+class SpritePack:
+    """A pack mapped into memory; image() wraps its pixels in a surface without decoding
+
+    The mapping is copy-on-write, so drawing onto a packed surface changes
+    this process's pages and never the file. Surfaces keep views into the
+    mapping, so it stays open for as long as the pack object lives.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        mv = memoryview(self.map)
+        if len(mv) < HEADER.size:
+            raise PackFormatError("file too short")
+        magic, version, fmt, n = HEADER.unpack_from(mv, 0)
+        if magic != MAGIC:
+            raise PackFormatError("not a sprite pack")
+        if version != FORMAT_VERSION:
+            raise PackFormatError(f"pack format {version}, expected {FORMAT_VERSION}")
+        self.format = fmt.decode()
+        self.entries = json.loads(bytes(mv[HEADER.size:HEADER.size + n]))
+        self.data_off = HEADER.size + n + _pad(HEADER.size + n)
+        self.view = mv
+
+    def image(self, name, source=None):
+        """Surface for name, or None if it isn't packed or source (its PNG) has changed since
+
+        A source with the packed mtime and size is taken as unchanged; any
+        other mtime (older ones too, as a checkout or copy can leave) is
+        settled by comparing content hashes.
+        """
+        e = self.entries.get(name)
+        if e is None:
+            return None
+        off, w, h, mtime, size, digest = e
+        if source is not None:
+            try:
+                st = os.stat(source)
+                if st.st_size != size:
+                    return None
+                if st.st_mtime != mtime and _digest(source) != digest:
+                    return None
+            except OSError:
+                pass  # shipped without the PNGs
+        start = self.data_off + off
+        return pg.image.frombuffer(self.view[start:start + w * h * 4], (w, h), self.format)
+
+
+def missing_from_pack(pack, assets_dir):
+    """Runtime images in assets_dir that pack lacks or holds a stale copy of"""
+    return [name for name in runtime_assets(assets_dir)
+            if pack.image(name, os.path.join(assets_dir, name)) is None]
+
+
+def open_pack(path):
+    """SpritePack at path, or None if there isn't a usable one"""
+    try:
+        return SpritePack(path)
+    except (OSError, ValueError, struct.error, PackFormatError):
+        return None
+
+
+if __name__ == "__main__":
+    # Build the pack: python assetpack.py [ASSETS_DIR] [OUT]
+    import time
+
+    assets_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+    t0 = time.perf_counter()
+    out, count = build_pack(assets_dir, sys.argv[2] if len(sys.argv) > 2 else None)
+    t1 = time.perf_counter()
+    pack = SpritePack(out)
+    for name in pack.entries:
+        pack.image(name)
+    t2 = time.perf_counter()
+    print(f"{out}: {count} images, {os.path.getsize(out)} bytes, build {1000*(t1-t0):.1f} ms, "
+          f"load all {1000*(t2-t1):.1f} ms")
@@ -3,10 +3,17 @@ Asset loading and animation system for Hive City Rampage
 Handles sprites, animations, and image loading
 """
 
+import hashlib
 import os
 import random
+from collections import Counter
+
 import pygame as pg
 
+from constants import ANIM_IDLE, ANIM_WALK, ANIM_ATTACK, ANIM_DEATH, ANIM_DEATH_TIME, SPRITE_PACK
+from constants import CLASSIFY_SURFACES
+from assetpack import open_pack
+
 
 def load_image(path):
     """Load an image with error handling"""
@@ -16,8 +23,96 @@ def load_image(path):
         return None
 
 
-def slice_strip(img, frame_w, frame_h):
-    """Slice a sprite sheet into frames"""
+# -------------------- SURFACE FORMATS --------------------
+OPAQUE, COLORKEY, ALPHA = "opaque", "colorkey", "alpha"
+SURFACE_CLASSES = (OPAQUE, COLORKEY, ALPHA)
+# Tried in order as the colorkey; the first one no visible pixel uses wins
+KEY_COLORS = ((255, 0, 255), (0, 255, 255), (255, 255, 0), (1, 254, 1))
+
+
+def classify(img):
+    """OPAQUE (no transparency), COLORKEY (every pixel fully opaque or fully clear) or ALPHA"""
+    w, h = img.get_size()
+    solid = pg.mask.from_surface(img, 254).count()
+    if solid == w * h:
+        return OPAQUE
+    if solid == pg.mask.from_surface(img, 0).count():
+        return COLORKEY
+    return ALPHA
+
+
+def optimize_surface(img):
+    """img in the fastest surface format that draws it the same, and its class
+
+    Opaque images lose their alpha channel (convert()); hard-edged ones are
+    converted with their clear pixels set to an unused key color and
+    RLE-accelerated colorkey; anything with partial alpha stays per-pixel.
+    """
+    cls = classify(img)
+    if cls == OPAQUE:
+        return img.convert(), cls
+    if cls == COLORKEY:
+        solid = pg.mask.from_surface(img, 254)
+        rgb = img.convert()
+        for key in KEY_COLORS:
+            if not pg.mask.from_threshold(rgb, key, (1, 1, 1, 255)).overlap_area(solid, (0, 0)):
+                clear = solid.copy()
+                clear.invert()
+                clear.to_surface(rgb, setcolor=key, unsetcolor=None)
+                rgb.set_colorkey(key, pg.RLEACCEL)
+                return rgb, cls
+        cls = ALPHA  # every key color is in use
+    if img.get_flags() & pg.SRCALPHA and img.get_masks() == _display_alpha_masks():
+        return img, cls  # already display format (e.g. straight from the sprite pack)
+    return img.convert_alpha(), cls
+
+
+def _display_alpha_masks():
+    return pg.Surface((1, 1), pg.SRCALPHA).convert_alpha().get_masks()
+
+
+def surface_class(surf):
+    """Format class of a surface as it is (whether or not it went through optimize_surface)"""
+    if surf.get_flags() & pg.SRCALPHA:
+        return ALPHA
+    return OPAQUE if surf.get_colorkey() is None else COLORKEY
+
+
+class FormatStats:
+    """What the classifier did: images and pixel bytes per class, and blits per class
+
+    blits is reset by the caller (per frame) and filled by count_blits()
+    from Surface.blits() sequences.
+    """
+    def __init__(self):
+        self.images = dict.fromkeys(SURFACE_CLASSES, 0)
+        self.bytes = dict.fromkeys(SURFACE_CLASSES, 0)
+        self.blits = dict.fromkeys(SURFACE_CLASSES, 0)
+
+    def add(self, surf, cls):
+        self.images[cls] += 1
+        self.bytes[cls] += surf.get_width() * surf.get_height() * 4
+
+    def count_blits(self, seq):
+        """Tally a blits() sequence ((surface, dest, ...) items) by surface class"""
+        for surf, n in Counter(item[0] for item in seq).items():
+            self.blits[surface_class(surf)] += n
+
+    def report(self):
+        """One line: images / KB per class, and the share moved off per-pixel alpha"""
+        parts = [f"{cls} {self.images[cls]} ({self.bytes[cls] // 1024} KB)" for cls in SURFACE_CLASSES]
+        total = sum(self.bytes.values())
+        fast = self.bytes[OPAQUE] + self.bytes[COLORKEY]
+        share = f"{100 * fast / total:.0f}%" if total else "-"
+        return f"Surface formats: {', '.join(parts)}; {share} of pixel bytes off per-pixel alpha"
+
+
+# -------------------- FRAMES --------------------
+def slice_strip(img, frame_w, frame_h, count=None):
+    """Slice a sprite sheet into frames (the first count, row by row)
+
+    Frames are subsurfaces: views into the sheet's pixels, not copies.
+    """
     if img is None:
         return []
     frames = []
@@ -27,53 +122,182 @@ def slice_strip(img, frame_w, frame_h):
     for y in range(rows):
         for x in range(cols):
             r = pg.Rect(x*frame_w, y*frame_h, frame_w, frame_h)
-            frames.append(img.subsurface(r).copy())
-    return frames
+            frames.append(img.subsurface(r))
+    return frames[:count]
 
 
-class Anim:
-    """Animation controller for sprites"""
-    def __init__(self, frames, fps=10):
-        self.frames = frames
-        self.fps = fps
-        self.t = 0.0
+def flip_frames(frames):
+    """Horizontally mirrored frames
 
-    def update(self, dt):
-        """Update animation timer"""
-        self.t += dt
+    Frames that are views into one sheet become views into a single
+    mirrored copy of that sheet; anything else is flipped frame by frame.
+    """
+    parent = frames[0].get_parent() if frames else None
+    if parent is None or any(f.get_parent() is not parent for f in frames):
+        return [pg.transform.flip(f, True, False) for f in frames]
+    mirror = pg.transform.flip(parent, True, False)
+    pw = parent.get_width()
+    out = []
+    for f in frames:
+        (x, y), (w, h) = f.get_offset(), f.get_size()
+        out.append(mirror.subsurface(pg.Rect(pw - x - w, y, w, h)))
+    return out
 
-    def frame(self):
-        """Get current frame"""
-        if not self.frames:
-            return None
-        i = int(self.t * self.fps) % len(self.frames)
-        return self.frames[i]
+
+def blit_source(surf):
+    """(surface, area) to blit surf from: a subsurface's top parent and its rect, else (surf, None)
+
+    Blitting a subsurface locks its parent on every call; blitting the
+    parent with an area rect draws the same pixels without that.
+    """
+    parent = surf.get_abs_parent()
+    if parent is surf:
+        return surf, None
+    return parent, pg.Rect(surf.get_abs_offset(), surf.get_size())
+
+
+def owned_bytes(surf):
+    """Pixel bytes a surface holds itself (0 for None, or a subsurface view of another's pixels)"""
+    if surf is None or surf.get_parent() is not None:
+        return 0
+    return surf.get_pitch() * surf.get_height()
 
 
 class AnimatedTile:
-    """Animation controller for tiles with random start offset"""
+    """Looping tile animation with a random start offset, sampled from the clock"""
     def __init__(self, frames, fps=10):
         self.frames = frames
         self.fps = fps
         self.t = random.random() * len(frames) / fps  # Random start time
 
-    def update(self, dt):
-        """Update animation timer"""
-        self.t += dt
-
-    def frame(self):
-        """Get current frame"""
+    def frame(self, now):
+        """Frame at time now"""
         if not self.frames:
             return None
-        i = int(self.t * self.fps) % len(self.frames)
+        i = int((now + self.t) * self.fps) % len(self.frames)
         return self.frames[i]
 
 
+class AnimTable:
+    """Animation clips per (kind, state), sampled from a start time at draw time
+
+    Entities hold no animation objects, only their state id and when it
+    started (entities.Entity.anim / anim_t), so nothing advances per frame:
+    frame() works the index out from the game clock. Mirrored frames are
+    made once here rather than flipped on every draw.
+    """
+    def __init__(self):
+        self.clips = {}  # (kind, state) -> (frames, flipped frames, fps, loop)
+
+    def add(self, kind, state, frames, fps, loop=True):
+        """Register a clip (ignored when frames is empty, so missing art falls back)"""
+        if frames:
+            flipped = flip_frames(frames)
+            self.clips[(kind, state)] = (frames, flipped, fps, loop)
+
+    def resolve(self, kinds):
+        """Fill in missing states once all clips are added
+
+        Walk and idle stand in for each other, attack falls back to walk,
+        and a missing death clip becomes a short fade-out of the idle pose.
+        """
+        clips = self.clips
+        for kind in kinds:
+            for state, fallback in ((ANIM_WALK, ANIM_IDLE), (ANIM_IDLE, ANIM_WALK), (ANIM_ATTACK, ANIM_WALK)):
+                if (kind, state) not in clips and (kind, fallback) in clips:
+                    clips[(kind, state)] = clips[(kind, fallback)]
+            if (kind, ANIM_DEATH) not in clips and (kind, ANIM_IDLE) in clips:
+                self.add(kind, ANIM_DEATH, fade_frames(clips[(kind, ANIM_IDLE)][0][0]),
+                         5 / ANIM_DEATH_TIME, loop=False)
+
+    def frame(self, kind, state, start, now, flip=False):
+        """Frame of kind's clip for state, started at start, at time now (None without art)"""
+        clip = self.clips.get((kind, state))
+        if clip is None:
+            return None
+        frames, flipped, fps, loop = clip
+        i = int((now - start) * fps)
+        i = i % len(frames) if loop else min(max(i, 0), len(frames) - 1)
+        return flipped[i] if flip else frames[i]
+
+    def surfaces(self):
+        """Every distinct frame held (views included), for memory reports"""
+        seen = {}
+        for frames, flipped, _, _ in self.clips.values():
+            for f in (*frames, *flipped):
+                seen[id(f)] = f
+        return list(seen.values())
+
+
+def fade_frames(img, count=5):
+    """img fading out over count frames"""
+    frames = []
+    for i in range(count):
+        f = img.convert_alpha()  # the fade needs an alpha channel, whatever img's format
+        a = 255 * (count - i) // (count + 1)
+        f.fill((255, 255, 255, a), special_flags=pg.BLEND_RGBA_MULT)
+        frames.append(f)
+    return frames
+
+
 class SpriteBank:
-    """Centralized sprite asset management"""
-    def __init__(self, assets_dir="assets"):
+    """Centralized sprite asset management
+
+    Images come from the pre-decoded sprite pack (SPRITE_PACK) when it
+    holds an up-to-date copy, otherwise from the PNG, and are put in the
+    fastest surface format for their transparency (optimize_surface) when
+    classify is on. formats keeps the tally. Sheets are cut up with
+    strip(), which hands out views into the sheet and shares identical
+    frames.
+    """
+    def __init__(self, assets_dir="assets", pack=SPRITE_PACK, classify=CLASSIFY_SURFACES):
         self.dir = assets_dir
         self.img = {}
+        self.pack = open_pack(os.path.join(assets_dir, pack)) if pack else None
+        self.classify = classify
+        self.formats = FormatStats()
+        self.seen = {}  # (size, class, colorkey, pixel digest) -> first frame with those pixels
+        self.sliced = 0  # frames handed out by strip()
+        self.shared = 0  # of those, duplicates of an earlier frame
+        self.view_bytes = 0  # pixel bytes the frames would hold as copies
+
+    def load(self, filename, optimize=True):
+        """Image file from the assets dir (None if missing)
+
+        optimize=False keeps per-pixel alpha, for images drawn with blend
+        flags (special_flags blits ignore colorkeys).
+        """
+        path = os.path.join(self.dir, filename)
+        img = self.pack.image(filename, path) if self.pack is not None else None
+        if img is None:
+            img = load_image(path)
+        if img is None:
+            return None
+        if self.classify and optimize:
+            img, cls = optimize_surface(img)
+        else:
+            cls = surface_class(img)
+        self.formats.add(img, cls)
+        return img
+
+    def strip(self, img, frame_w, frame_h=None, count=None):
+        """Frames of a sheet (see slice_strip), with frames identical to earlier ones shared"""
+        if img is None:
+            return []
+        out = []
+        for f in slice_strip(img, frame_w, frame_h or img.get_height(), count):
+            digest = hashlib.blake2b(pg.image.tobytes(f, "RGBA"), digest_size=16).digest()
+            first = self.seen.setdefault((f.get_size(), surface_class(f), f.get_colorkey(), digest), f)
+            self.sliced += 1
+            self.shared += first is not f
+            self.view_bytes += f.get_width() * f.get_height() * 4
+            out.append(first)
+        return out
+
+    def frame_report(self):
+        """One line: frames sliced as views, duplicates shared and the copy bytes that saved"""
+        return (f"Frames: {self.sliced} sliced as views into their sheets, {self.shared} shared duplicates, "
+                f"{self.view_bytes // 1024} KB not copied")
 
     def get(self, key):
         """Get stored image data"""
@@ -81,20 +305,22 @@ class SpriteBank:
 
     def load_anim(self, key, filename, frames=4, fps=10):
         """Load animation strip. Frames are auto-sized from image width."""
-        path = os.path.join(self.dir, filename)
-        img = load_image(path)
-        if img:
-            w, h = img.get_size()
-            frame_w = w // frames
-            frame_list = slice_strip(img, frame_w, h)
-        else:
-            frame_list = []
+        img = self.load(filename)
+        frame_list = self.strip(img, img.get_width() // frames, count=frames) if img else []
         self.img[key] = (img, frame_list, fps)
 
-    def anim(self, key):
-        """Create animation instance from loaded data"""
+    def frames(self, key):
+        """Loaded frames and fps for key (empty if it failed to load)"""
         pack = self.img.get(key)
         if not pack:
-            return Anim([], 10)
-        _, frames, fps = pack
-        return Anim(frames, fps)
\ No newline at end of file
+            return [], 10
+        return pack[1], pack[2]
+
+    def pixel_bytes(self):
+        """Pixel bytes held as (full sheets, sliced frames); views into a sheet hold none"""
+        sheets = frames = 0
+        for img, frame_list, _ in self.img.values():
+            sheets += owned_bytes(img)
+            for f in frame_list:
+                frames += owned_bytes(f)
+        return sheets, frames
\ No newline at end of file
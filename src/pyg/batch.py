@@ -0,0 +1,157 @@
+"""
+Headless batch runner for Hive City Rampage
+Plays many seeded games with a scripted player in a process pool and summarizes them for tuning
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from constants import FPS, GRENADE_RADIUS, BATCH_MAX_TIME, CROWD_SOLVER
+from utils import dist2
+from world import new_arena
+from sim import Game, Controls, ENEMY_KINDS, CROWD_SOLVERS
+
+
+class ScriptedPlayer:
+    """Simple bot: shoots the nearest enemy, keeps its distance and grenades crowds
+
+    It steers with the same -1/0/1 axes as the keyboard and aims through the
+    screen-space aim point, so it plays by the same rules as a person. Its
+    own RNG (strafe direction) keeps the gameplay RNG untouched.
+    """
+    def __init__(self, seed, near=150, far=320, crowd=4):
+        self.rng = random.Random(seed)
+        self.near = near
+        self.far = far
+        self.crowd = crowd
+        self.strafe = 1
+        self.switch_t = 0.0
+
+    def __call__(self, game):
+        p, cam = game.player, game.camera
+        if game.now >= self.switch_t:
+            self.strafe = self.rng.choice((-1, 1))
+            self.switch_t = game.now + self.rng.uniform(0.5, 2.0)
+        if not game.enemies:
+            return Controls(self.strafe, 0, p.x - cam.x, p.y - cam.y, False, False)
+
+        target = min(game.enemies, key=lambda e: dist2(e.x, e.y, p.x, p.y))
+        dx, dy = target.x - p.x, target.y - p.y
+        d2 = dx*dx + dy*dy
+        if d2 < self.near**2:
+            mx, my = -dx, -dy  # back off
+        elif d2 > self.far**2:
+            mx, my = dx, dy  # close in
+        else:
+            mx, my = -dy * self.strafe, dx * self.strafe  # circle
+        ax = (mx > abs(my) / 2) - (mx < -abs(my) / 2)
+        ay = (my > abs(mx) / 2) - (my < -abs(mx) / 2)
+
+        crowd = sum(1 for e in game.enemies if dist2(e.x, e.y, p.x, p.y) < GRENADE_RADIUS**2)
+        # Aim point in screen coordinates, as the mouse would give it
+        return Controls(ax, ay, target.x - cam.x + cam.frame_shake_x, target.y - cam.y + cam.frame_shake_y,
+                        True, crowd >= self.crowd)
+
+
+def play(seed, max_time=BATCH_MAX_TIME, crowd=CROWD_SOLVER):
+    """One headless game on seed until the player dies for good or max_time game seconds pass"""
+    arena = new_arena(seed)
+    random.seed(seed)  # gameplay RNG independent of how much the generator drew
+    game = Game(arena, crowd=crowd)
+    bot = ScriptedPlayer(seed)
+    dt = 1.0 / FPS
+    kills = Counter()
+    peak = ticks = 0
+    t0 = time.perf_counter()
+    for ticks in range(1, int(max_time * FPS) + 1):
+        game.step(dt, bot(game))
+        for kill in game.kills:
+            kills[kill.enemy.kind] += 1
+        peak = max(peak, len(game.enemies))
+        if game.player.hp <= 0:
+            break
+    wall = time.perf_counter() - t0
+    return {
+        "seed": seed, "wave": game.director.wave, "survived_s": ticks * dt,
+        "died": game.player.hp <= 0, "score": game.player.points,
+        "kills": sum(kills.values()), "peak_enemies": peak,
+        **{f"kills_{kind}": kills[kind] for kind in ENEMY_KINDS},
+        "ticks": ticks, "ticks_per_s": ticks / wall if wall > 0 else 0.0,
+    }
+
+
+def run_batch(seeds, workers=None, max_time=BATCH_MAX_TIME, progress=True, crowd=CROWD_SOLVER):
+    """Play every seed, spread over a process pool (workers=1 plays in this process)
+
+    Runs share nothing, so throughput grows with the number of workers up
+    to the core count.
+    """
+    results = []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for seed in seeds:
+            results.append(play(seed, max_time, crowd))
+            if progress:
+                print(f"\r{len(results)}/{len(seeds)} runs", end="", flush=True)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play, seed, max_time, crowd) for seed in seeds]
+            for fut in as_completed(futures):
+                results.append(fut.result())
+                if progress:
+                    print(f"\r{len(results)}/{len(seeds)} runs", end="", flush=True)
+    if progress:
+        print()
+    results.sort(key=lambda r: r["seed"])
+    return results
+
+
+def summary(results, wall):
+    """Summary table (mean / min / median / max per stat) plus wave distribution and throughput"""
+    lines = [f"{'stat':<16}{'mean':>10}{'min':>10}{'median':>10}{'max':>10}"]
+    for key in ("wave", "survived_s", "score", "kills", *(f"kills_{k}" for k in ENEMY_KINDS),
+                "peak_enemies", "ticks_per_s"):
+        vals = [r[key] for r in results]
+        lines.append(f"{key:<16}{statistics.fmean(vals):>10.1f}{min(vals):>10.1f}"
+                     f"{statistics.median(vals):>10.1f}{max(vals):>10.1f}")
+    died = sum(r["died"] for r in results)
+    waves = Counter(r["wave"] for r in results)
+    lines.append(f"died {died}/{len(results)}; waves reached: "
+                 + ", ".join(f"{w}: {n}" for w, n in sorted(waves.items())))
+    ticks = sum(r["ticks"] for r in results)
+    lines.append(f"{len(results)} runs, {ticks} ticks in {wall:.1f} s: {ticks / wall:.0f} ticks/s overall")
+    return "\n".join(lines)
+
+
+def write_csv(results, path):
+    """Per-run results as CSV"""
+    import csv
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(results[0]))
+        w.writeheader()
+        w.writerows(results)
+
+
+if __name__ == "__main__":
+    # python batch.py --runs 1000 [--workers N] [--first-seed S] [--max-time SECONDS] [--crowd density] [--csv out.csv]
+    ap = argparse.ArgumentParser(description="Play seeded headless games and summarize them")
+    ap.add_argument("--runs", type=int, default=100)
+    ap.add_argument("--first-seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    ap.add_argument("--max-time", type=float, default=BATCH_MAX_TIME, help="game seconds per run")
+    ap.add_argument("--crowd", choices=CROWD_SOLVERS, default=CROWD_SOLVER, help="enemy separation solver")
+    ap.add_argument("--csv", help="also write per-run results here")
+    args = ap.parse_args()
+
+    seeds = list(range(args.first_seed, args.first_seed + args.runs))
+    t0 = time.perf_counter()
+    results = run_batch(seeds, args.workers, args.max_time, crowd=args.crowd)
+    print(summary(results, time.perf_counter() - t0))
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"Per-run results written to {args.csv}")
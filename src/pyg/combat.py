@@ -0,0 +1,65 @@
+"""
+Damage resolution for Hive City Rampage
+Hits on enemies are queued during a tick and resolved in one batched pass
+"""
+
+from collections import namedtuple
+
+from tracing import span
+
+
+# One enemy killed this tick and the hit that finished it ("bullet", "grenade", "melee")
+Kill = namedtuple("Kill", "enemy cause")
+
+
+class DamageQueue:
+    """Per-tick queue of enemy damage and screen shakes
+
+    Bullets, grenades and melee only record hits while the tick runs;
+    resolve() then applies them in order, emits one Kill per enemy that
+    dropped to 0 HP, and removes the dead in a single sweep instead of
+    enemies.remove() mid-iteration. Shakes are merged per cause, so a burst
+    of hits in one tick shakes the camera once rather than once per hit.
+    """
+    def __init__(self):
+        self.hits = []  # (enemy, amount, cause, shake, kill_shake)
+        self.shakes = {}  # cause -> (pow, t)
+
+    def hit(self, enemy, amount, cause, shake=None, kill_shake=None):
+        """Queue damage; shake applies if the enemy survives the tick, kill_shake if this hit kills it"""
+        self.hits.append((enemy, amount, cause, shake, kill_shake or shake))
+
+    def shake(self, pow_, t, cause):
+        """Queue a screen shake, merged with others of the same cause this tick"""
+        old = self.shakes.get(cause)
+        if old is not None:
+            pow_, t = max(pow_, old[0]), max(t, old[1])
+        self.shakes[cause] = (pow_, t)
+
+    def resolve(self, enemies, camera):
+        """Apply queued hits and shakes, drop dead enemies, return this tick's kills"""
+        with span("DamageQueue.resolve"):
+            kills = []
+            for e, amount, cause, shake, kill_shake in self.hits:
+                if e.hp <= 0:
+                    continue  # already killed this tick
+                e.hp -= amount
+                if e.hp <= 0:
+                    kills.append(Kill(e, cause))
+                    shake = kill_shake
+                if shake is not None:
+                    self.shake(shake[0], shake[1], cause)
+            self.hits.clear()
+
+            for pow_, t in self.shakes.values():
+                camera.add_shake(pow_, t)
+            self.shakes.clear()
+
+            if kills:
+                enemies[:] = [e for e in enemies if e.hp > 0]
+            return kills
+
+    def clear(self):
+        """Drop anything queued (restart)"""
+        self.hits.clear()
+        self.shakes.clear()
@@ -4,14 +4,37 @@ All gameplay configuration in one place for easy tuning
 """
 
 # -------------------- DISPLAY --------------------
-W, H = 960, 540
+W, H = 960, 540  # internal render resolution
+RENDER_SCALE_MODE = "sdl"  # "sdl" (pg.SCALED, GPU), "integer" or "smooth" (one software scale per frame)
+WINDOW_SIZE = None  # window size for "integer"/"smooth" when not fullscreen, None = (W, H)
+FULLSCREEN = False
 FPS = 60
 TILE = 32
+PRIMITIVE_CACHE_SIZE = 64  # pre-rendered pickup/placeholder sprites kept (LRU)
+SPRITE_PACK = "sprites.hcrp"  # pre-decoded pixel pack in the assets dir (python assetpack.py), used when present
+CLASSIFY_SURFACES = True  # give opaque / hard-edged images plain or colorkey surfaces instead of per-pixel alpha
 WORLD_W, WORLD_H = 120, 90  # in tiles
+ARENA_GENERATOR = "numpy"  # "numpy" (vectorized, needs NumPy) or "python"
+ARENA_SEED = None  # fixed seed for every run (cached in MAP_CACHE_DIR), None = random
+MAP_FILE = None  # path of a curated .hcra map to play instead of generating
+MAP_CACHE_DIR = "map_cache"  # seed-keyed arena cache (relative to the game directory)
+PREGEN_ENABLED = True  # build the next arena in a background process for instant restarts
+SIM_PROCESS = False  # run the simulation in its own process; the renderer reads shared-memory snapshots
+SIM_MAX_ROWS = 4096  # entity rows per snapshot (bullets, pickups, enemies, effects); extras aren't drawn
+
+# -------------------- STREAMING WORLD --------------------
+WORLD_MODE = "arena"  # "arena" (whole map up front) or "stream" (chunks around the player, needs NumPy)
+STREAM_WORLD_W, STREAM_WORLD_H = 4096, 4096  # map size in tiles for stream mode
+STREAM_CHUNK = 48  # chunk edge in tiles (a multiple of the 16x12 corridor grid)
+STREAM_RADIUS = 1  # chunks kept resident around the player's chunk
+STREAM_MAX_CHUNKS = 36  # LRU capacity in chunks (~150 KB each)
 
 # -------------------- ANIMATION --------------------
 SPR_FPS_IDLE = 6
 SPR_FPS_WALK = 10
+ANIM_IDLE, ANIM_WALK, ANIM_ATTACK, ANIM_DEATH = range(4)  # entity animation states
+ANIM_ATTACK_TIME = 0.3  # seconds an enemy stays in its attack animation
+ANIM_DEATH_TIME = 0.4  # seconds a killed enemy's death animation lingers
 
 # -------------------- PLAYER MOVEMENT --------------------
 PLAYER_ACC = 25.0
@@ -24,7 +47,14 @@ SHOT_COOLDOWN_FR = 6
 AIM_RANGE = 10 * TILE
 AIM_CONE = 0.45
 AIM_SMOOTH = 0.16
-AIM_HOLD_FR = 10
+AIM_HOLD_FR = 10  # frames a target is kept before the cone is searched again
+AIM_ASSIST = True  # bend mouse aim toward enemies in the aim cone
+AIM_PULL = 0.35  # fraction of the way from the pointer to the target
+AIM_EVAL_BUDGET = 24  # enemies examined per target search (nearest cells first)
+SPATIAL_CELL = 2 * TILE  # spatial.SpatialGrid bucket size
+
+# -------------------- CROWD --------------------
+CROWD_SOLVER = "pairwise"  # enemy separation: "pairwise" (every pair) or "density" (spatial.DensityField); F6 switches in game
 
 # -------------------- SPAWNING & FAIRNESS --------------------
 SAFE_SPAWN_DIST = 8 * TILE
@@ -56,6 +86,10 @@ GRENADE_KNOCKBACK = 800  # knockback force
 MAX_GRENADES = 5  # starting grenades
 GRENADE_PICKUP_CHANCE = 0.08  # chance to drop grenade pickup
 
+# -------------------- DECALS --------------------
+DECAL_REGION_TILES = 16  # side of one persistent decal surface, in tiles
+DECAL_BUDGET_MB = 16  # pixel memory for decal surfaces before old regions are dropped
+
 # -------------------- SCORING --------------------
 POINTS_GRUNT = 10
 POINTS_RUNNER = 15
@@ -66,4 +100,24 @@ COMBO_MULTIPLIER = 0.5  # bonus per combo level (1.0, 1.5, 2.0, ...)
 WAVE_BONUS_BASE = 100  # base points per wave completed
 
 # -------------------- STIM PACKS --------------------
-MAX_STIMS = 3
\ No newline at end of file
+MAX_STIMS = 3
+
+# -------------------- DEBUG / PROFILING --------------------
+PERF_HISTORY = 120  # frames of history kept by the F3 performance overlay
+TRACE_ENABLED = False  # record spans from startup (F8 toggles in game)
+TRACE_CAPACITY = 20000  # spans kept in the ring buffer (~1000 frames)
+TRACE_SPIKE_MS = 33.0  # frames slower than this dump the trace buffer automatically
+TRACE_SPIKE_COOLDOWN = 5.0  # seconds between automatic spike dumps
+TRACE_DIR = "traces"  # where trace JSON files are written (relative to the game directory)
+MEM_REPORT_ENABLED = False  # tracemalloc memory reporter (slows the game noticeably)
+MEM_REPORT_INTERVAL = 10.0  # seconds between memory snapshots
+MEM_REPORT_LOG = "memory.log"  # JSON-lines snapshot log (relative to the game directory)
+MEM_REPORT_FRAMES = 1  # traceback depth kept by tracemalloc
+BATCH_MAX_TIME = 300.0  # game seconds before a headless batch run (batch.py) is stopped
+ENV_VIEW_TILES = 8  # env.VecEnv: tiles of Arena.solid observed on each side of the player
+ENV_MAX_ENEMIES = 32  # env.VecEnv: nearest enemies / bullets in an observation (padded)
+ENV_MAX_BULLETS = 32
+SOAK_SAMPLE_INTERVAL = 10.0  # wall seconds between soak.py samples
+SOAK_RUN_TIME = 120.0  # game seconds before a soak run restarts on the next seed
+SOAK_LOG = "soak.jsonl"  # soak.py samples, one JSON object per line (relative to the game directory)
+INPUT_RECORD = None  # write every frame's input to this file (soak.py --inputs replays it)
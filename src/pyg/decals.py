@@ -0,0 +1,102 @@
+"""
+Dynamic decals for Hive City Rampage
+Combat marks stamped once into persistent per-region surfaces under a memory budget
+"""
+
+import math
+import random
+from collections import OrderedDict
+
+import pygame as pg
+
+from constants import DECAL_REGION_TILES, DECAL_BUDGET_MB, TILE
+
+
+# Stamp size relative to the 32px decal art
+STAMP_SCALE = {"scorch_mark": 3, "blood_pool": 1.5}
+
+
+class DecalLayer:
+    """Blood, scorch marks and casings left by combat
+
+    A stamp is blitted once into the transparent surface of the map region
+    (DECAL_REGION_TILES square) it lands on; each frame only the regions
+    overlapping the view are drawn, so the cost doesn't grow with the
+    number of stamps. Regions are kept in LRU order (stamping or drawing
+    touches them) and the least recently used is dropped, marks and all,
+    once their pixel memory exceeds DECAL_BUDGET_MB.
+    """
+    def __init__(self, images, region_tiles=DECAL_REGION_TILES, budget_mb=DECAL_BUDGET_MB):
+        self.size = region_tiles * TILE
+        self.max_regions = max(1, int(budget_mb * 2**20) // (self.size * self.size * 4))
+        self.regions = OrderedDict()  # (rx, ry) -> Surface, least recently used first
+        self.rng = random.Random()  # keeps decal variety off the gameplay RNG
+        self.stamps = 0
+        self.evicted = 0
+        # Four rotations per decal so stamps don't all look alike
+        self.variants = {}
+        for kind, img in images.items():
+            if img is None:
+                continue
+            scale = STAMP_SCALE.get(kind, 1)
+            if scale != 1:
+                w, h = img.get_size()
+                img = pg.transform.smoothscale(img, (int(w * scale), int(h * scale)))
+            self.variants[kind] = [pg.transform.rotate(img, angle) for angle in (0, 90, 180, 270)]
+
+    def stamp(self, kind, x, y, spread=0):
+        """Leave a decal centered near world x, y (randomly offset by up to spread px)"""
+        variants = self.variants.get(kind)
+        if not variants:
+            return
+        img = self.rng.choice(variants)
+        if spread:
+            x += self.rng.uniform(-spread, spread)
+            y += self.rng.uniform(-spread, spread)
+        w, h = img.get_size()
+        left, top = int(x) - w//2, int(y) - h//2
+        # Stamps straddling a region edge go into every region they touch
+        s = self.size
+        for ry in range(top // s, (top + h - 1) // s + 1):
+            for rx in range(left // s, (left + w - 1) // s + 1):
+                self._region(rx, ry).blit(img, (left - rx*s, top - ry*s))
+        self.stamps += 1
+
+    def _region(self, rx, ry):
+        """Surface of a region, created (and the budget enforced) on first use"""
+        key = (rx, ry)
+        surf = self.regions.get(key)
+        if surf is not None:
+            self.regions.move_to_end(key)
+            return surf
+        surf = self.regions[key] = pg.Surface((self.size, self.size), pg.SRCALPHA)
+        while len(self.regions) > self.max_regions:
+            self.regions.popitem(last=False)
+            self.evicted += 1
+        return surf
+
+    def draw(self, screen, camera):
+        """Blit the regions overlapping the view"""
+        if not self.regions:
+            return
+        s = self.size
+        # One integer view origin for all regions so their edges line up
+        x0 = math.floor(camera.x - camera.frame_shake_x)
+        y0 = math.floor(camera.y - camera.frame_shake_y)
+        sw, sh = screen.get_size()
+        for ry in range(y0 // s, (y0 + sh) // s + 1):
+            for rx in range(x0 // s, (x0 + sw) // s + 1):
+                surf = self.regions.get((rx, ry))
+                if surf is not None:
+                    self.regions.move_to_end((rx, ry))
+                    screen.blit(surf, (rx*s - x0, ry*s - y0))
+
+    def nbytes(self):
+        """Pixel memory held by region surfaces"""
+        return len(self.regions) * self.size * self.size * 4
+
+    def clear(self):
+        """Remove every mark (restart)"""
+        self.regions.clear()
+        self.stamps = 0
+        self.evicted = 0
@@ -19,8 +19,8 @@ class Director:
         self.spawn_cd = 0.0
         self.intensity = 1.0
 
-    def tick(self, dt, arena, player, enemies, camera):
-        """Update director state and spawn enemies"""
+    def tick(self, dt, arena, player, enemies, camera, now=0.0):
+        """Update director state and spawn enemies (now: game time, stamped on spawns)"""
         self.t += dt
 
         # Budget and intensity scaling
@@ -88,4 +88,4 @@ class Director:
         # Spawn if budget allows
         if self.budget >= cost:
             self.budget -= cost
-            enemies.append(Enemy(sx, sy, kind=kind, wave=self.wave))
\ No newline at end of file
+            enemies.append(Enemy(sx, sy, kind=kind, wave=self.wave, born=now))
\ No newline at end of file
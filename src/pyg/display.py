@@ -0,0 +1,86 @@
+"""
+Display setup for Hive City Rampage
+The game renders at a fixed internal resolution and is scaled to the window once per frame
+"""
+
+import pygame as pg
+
+from constants import W, H, RENDER_SCALE_MODE, WINDOW_SIZE, FULLSCREEN
+
+
+def init_pygame():
+    """Start only the pygame modules the game uses
+
+    pg.init() also opens audio and scans for joysticks, neither of which
+    the game touches, and both can take a noticeable part of startup.
+    """
+    pg.display.init()
+    pg.font.init()
+
+
+class Display:
+    """Internal W x H render target and how it reaches the window
+
+    Modes (RENDER_SCALE_MODE):
+      "sdl"     - pg.SCALED: the display surface itself is W x H and SDL's
+                  renderer scales it on the GPU (letterboxed, mouse mapped)
+      "integer" - software pg.transform.scale by the largest whole factor
+                  that fits, centered with black bars; crisp pixels
+      "smooth"  - pg.transform.smoothscale to the largest size that fits
+                  keeping the aspect ratio
+    Everything draws to .surface; present() does the single scale and flip.
+    """
+    def __init__(self, mode=RENDER_SCALE_MODE, window=WINDOW_SIZE, fullscreen=FULLSCREEN):
+        self.mode = mode
+        flags = pg.FULLSCREEN if fullscreen else 0
+        if mode == "sdl":
+            self.window = pg.display.set_mode((W, H), flags | pg.SCALED)
+            self.surface = self.window
+        else:
+            size = (0, 0) if fullscreen else (window or (W, H))
+            self.window = pg.display.set_mode(size, flags | (0 if fullscreen else pg.RESIZABLE))
+            self.surface = pg.Surface((W, H)).convert()
+        self.win_size = None
+        self.dest = None
+        self._layout()
+
+    def _layout(self):
+        """Recompute the scaled frame's rect (window size changed)"""
+        self.win_size = ww, wh = self.window.get_size()
+        if self.mode == "sdl":
+            self.dest = pg.Rect(0, 0, W, H)
+            return
+        if self.mode == "integer":
+            k = max(1, min(ww // W, wh // H))
+            w, h = W * k, H * k
+        else:
+            k = min(ww / W, wh / H)
+            w, h = max(1, int(W * k)), max(1, int(H * k))
+        w, h = min(w, ww), min(h, wh)
+        self.dest = pg.Rect((ww - w) // 2, (wh - h) // 2, w, h)
+        self.window.fill((0, 0, 0))
+        # Scaling straight into a subsurface view of the window avoids a temporary surface
+        self.target = self.window.subsurface(self.dest)
+
+    def present(self):
+        """Scale the internal frame to the window and flip"""
+        if self.mode != "sdl":
+            window = pg.display.get_surface()
+            if window is not self.window or window.get_size() != self.win_size:
+                self.window = window
+                self._layout()
+            if self.dest.size == (W, H):
+                self.target.blit(self.surface, (0, 0))
+            elif self.mode == "integer":
+                pg.transform.scale(self.surface, self.dest.size, self.target)
+            else:
+                pg.transform.smoothscale(self.surface, self.dest.size, self.target)
+        pg.display.flip()
+
+    def mouse_pos(self):
+        """Mouse position in internal render coordinates"""
+        mx, my = pg.mouse.get_pos()
+        if self.mode == "sdl":
+            return mx, my  # SDL already maps it
+        return ((mx - self.dest.x) * W // self.dest.w,
+                (my - self.dest.y) * H // self.dest.h)
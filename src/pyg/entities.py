@@ -15,6 +15,16 @@ class Entity:
         self.vx = 0.0
         self.vy = 0.0
         self.r = r  # collision radius
+        # Animation state and the game time it started; the renderer samples
+        # the frame from these and the game clock (assets.AnimTable)
+        self.anim = ANIM_IDLE
+        self.anim_t = 0.0
+
+    def set_anim(self, state, now):
+        """Switch animation state (staying in the same state keeps its clip running)"""
+        if state != self.anim:
+            self.anim = state
+            self.anim_t = now
 
     def try_move(self, arena, dx, dy):
         """Try to move with collision detection"""
@@ -48,6 +58,7 @@ class Player(Entity):
         self.aim = (1, 0)
         self.aim_tgt = None
         self.aim_hold = 0
+        self.aim_off = (0.0, 0.0)  # smoothed aim assist offset
         self.walk_phase = 0.0
         self.shoot_flash = 0.0
         self.step_t = 0  # footstep timer for subtle movement shake
@@ -69,16 +80,18 @@ class Player(Entity):
 
 class Enemy(Entity):
     """Enemy with different types and behaviors"""
-    def __init__(self, x, y, kind="grunt", wave=1):
+    def __init__(self, x, y, kind="grunt", wave=1, born=0.0):
         super().__init__(x, y, r=14)
         base_sp = 1.6 + wave*0.05
         base_hp = 2 + int(wave*0.20)
         self.kind = kind
-        self.hit_cd = 0
+        self.anim = ANIM_WALK
+        self.anim_t = born - (x * 0.013 + y * 0.007) % 1.0  # spread out the phases of a spawn batch
+        self.hit_ready = born  # game time melee is ready again
         self.dmg = 1
         self.hp = base_hp
         self.spd = base_sp
-        self.shoot_cd = random.uniform(0.8, 1.6)
+        self.shoot_ready = born + random.uniform(0.8, 1.6)  # game time of next shot
         # Knockback velocity (for smooth bounce)
         self.knock_vx = 0.0
         self.knock_vy = 0.0
@@ -90,47 +103,74 @@ class Enemy(Entity):
         elif kind == "shooter":
             self.spd *= 0.92
             self.hp += 1
-            self.shoot_cd = random.uniform(0.6, 1.2)
+            self.shoot_ready = born + random.uniform(0.6, 1.2)
         elif kind == "brute":
             self.spd *= 0.78
             self.hp += 3
             self.dmg = 2
 
 
+# Short-lived objects below carry their spawn time (born) and lifetime in
+# seconds; expiry is scheduled on a timers.TimerWheel instead of counted down.
 class Bullet:
     """Projectile class"""
-    def __init__(self, x, y, vx, vy, life=0.8, owner="player"):
+    def __init__(self, x, y, vx, vy, life=0.8, owner="player", born=0.0):
         self.x = x
         self.y = y
         self.vx = vx
         self.vy = vy
+        self.born = born
         self.life = life
         self.owner = owner
+        self.expired = False
 
 
 class Pickup:
     """Collectible items (health, shield, grenade)"""
-    def __init__(self, x, y, kind="health"):
+    def __init__(self, x, y, kind="health", born=0.0):
         self.x = x
         self.y = y
         self.kind = kind  # "health", "shield", or "grenade"
+        self.born = born
         self.life = 15.0  # despawn after 15 seconds
+        self.expired = False
+
+
+class Corpse:
+    """Killed enemy playing its death animation"""
+    def __init__(self, x, y, kind="grunt", born=0.0):
+        self.x = x
+        self.y = y
+        self.kind = kind
+        self.born = born
+        self.life = ANIM_DEATH_TIME
+        self.expired = False
 
 
 class Explosion:
     """Explosion animation container"""
-    def __init__(self, x, y):
+    def __init__(self, x, y, born=0.0):
         self.x = x
         self.y = y
-        self.frame = 0
+        self.born = born
         self.life = 0.5  # seconds for full animation
+        self.expired = False
+
+    def frame(self, now):
+        """Animation frame at game time now (8 frames over 0.5 seconds)"""
+        return int((now - self.born) * 16)
 
 
 class VFX:
     """Visual effects (smoke, shockwave)"""
-    def __init__(self, x, y, kind="smoke"):
+    def __init__(self, x, y, kind="smoke", born=0.0):
         self.x = x
         self.y = y
         self.kind = kind  # "smoke" or "shockwave"
-        self.frame = 0
-        self.life = 0.4 if kind == "smoke" else 0.3
\ No newline at end of file
+        self.born = born
+        self.life = 0.4 if kind == "smoke" else 0.3
+        self.expired = False
+
+    def frame(self, now):
+        """Animation frame at game time now (6 frames over the lifetime)"""
+        return int((now - self.born) * (15 if self.kind == "smoke" else 20))
\ No newline at end of file
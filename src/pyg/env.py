@@ -0,0 +1,170 @@
+"""
+Vectorized environment for Hive City Rampage
+Steps K headless games per call and returns batched NumPy observations and rewards for AI players
+"""
+
+import random
+
+import numpy as np
+
+from constants import FPS, TILE, ARENA_GENERATOR, ENV_VIEW_TILES, ENV_MAX_ENEMIES, ENV_MAX_BULLETS, MAX_STIMS
+from constants import BATCH_MAX_TIME
+from world import Arena
+from arena_np import NumpyArena
+from sim import Game, Controls, ENEMY_KINDS
+
+
+# Columns of the observation arrays
+ENEMY_FIELDS = ("dx", "dy", "kind", "hp")  # position relative to the player, ENEMY_KINDS index
+BULLET_FIELDS = ("dx", "dy", "vx", "vy", "hostile")
+PLAYER_FIELDS = ("hp", "shield", "grenades", "stims_left", "combo", "wave", "vx", "vy")
+
+
+def _arena(seed):
+    """Whole-map arena for seed (the solid crop needs the full grid, so never stream mode)"""
+    return Arena(seed) if ARENA_GENERATOR == "python" else NumpyArena(seed)
+
+
+class VecEnv:
+    """K independent games behind one step() call
+
+    Observations live in preallocated batch arrays that every step()
+    overwrites in place; each game writes its own row directly, so there
+    are no per-game observation arrays to stack. The returned dict holds
+    the same arrays each time (copy them to keep history):
+
+      grid        (K, S, S) uint8    Arena.solid around the player, S = 2*view+1, 1 off-map
+      enemies     (K, E, 4) float32  nearest enemies, ENEMY_FIELDS, zero padded
+      n_enemies   (K,) int32         valid rows in enemies
+      bullets     (K, B, 5) float32  nearest bullets, BULLET_FIELDS, zero padded
+      n_bullets   (K,) int32
+      player      (K, 8) float32     PLAYER_FIELDS
+
+    Actions are a (K, 6) array: move x, move y (-1..1, like the keys), aim
+    direction x, y (world space, any length), fire, grenade (> 0.5 = held).
+    The reward is the score gained during the step. A game that ends (out
+    of stims, or max_time game seconds) is restarted on its next seed
+    right away; its final score and wave are in the info dict.
+
+    The game code draws from the random module, so each game keeps its
+    own saved random state and only runs with it swapped in: a seed plays
+    the same episode whatever the other games (or the caller) draw, and
+    the caller's random state is left as it was.
+    """
+    def __init__(self, num_envs, seed=0, frame_skip=1, view=ENV_VIEW_TILES,
+                 max_enemies=ENV_MAX_ENEMIES, max_bullets=ENV_MAX_BULLETS, max_time=BATCH_MAX_TIME):
+        self.num_envs = k = num_envs
+        self.frame_skip = frame_skip
+        self.view = view
+        self.max_ticks = int(max_time * FPS)
+        self.next_seed = seed
+        self.games = [None] * k
+        self.seeds = [0] * k
+        self.padded = [None] * k  # solid grid padded by view tiles of wall
+        self.rng_states = [None] * k  # random.getstate() of each game between its ticks
+        self.ticks = np.zeros(k, np.int64)
+        self.last_points = np.zeros(k, np.int64)
+
+        s = 2 * view + 1
+        self.obs = {
+            "grid": np.ones((k, s, s), np.uint8),
+            "enemies": np.zeros((k, max_enemies, len(ENEMY_FIELDS)), np.float32),
+            "n_enemies": np.zeros(k, np.int32),
+            "bullets": np.zeros((k, max_bullets, len(BULLET_FIELDS)), np.float32),
+            "n_bullets": np.zeros(k, np.int32),
+            "player": np.zeros((k, len(PLAYER_FIELDS)), np.float32),
+        }
+        self.rewards = np.zeros(k, np.float32)
+        self.dones = np.zeros(k, bool)
+        self.final_points = np.zeros(k, np.int64)
+        self.final_wave = np.zeros(k, np.int32)
+
+    def _start(self, i):
+        """Begin game i on the next seed"""
+        seed = self.seeds[i] = self.next_seed
+        self.next_seed += 1
+        arena = _arena(seed)
+        random.seed(seed)  # gameplay RNG independent of how much the generator drew
+        self.games[i] = Game(arena)
+        self.rng_states[i] = random.getstate()
+        self.padded[i] = np.pad(np.asarray(arena.solid, np.uint8), self.view, constant_values=1)
+        self.ticks[i] = 0
+        self.last_points[i] = 0
+
+    def reset(self):
+        """Start every game and return the first observations"""
+        outer = random.getstate()
+        for i in range(self.num_envs):
+            self._start(i)
+            self._observe(i)
+        random.setstate(outer)
+        return self.obs
+
+    def step(self, actions):
+        """Apply one action per game, advance each frame_skip ticks; returns (obs, rewards, dones, info)"""
+        actions = np.asarray(actions, np.float32)
+        dt = 1.0 / FPS
+        self.rewards[:] = 0.0
+        self.dones[:] = False
+        outer = random.getstate()
+        for i, game in enumerate(self.games):
+            ax, ay, aim_x, aim_y, fire, grenade = actions[i].tolist()
+            p, cam = game.player, game.camera
+            # Aim point 100 px along the aim direction, in screen coordinates like the mouse
+            d = max(1e-6, (aim_x*aim_x + aim_y*aim_y) ** 0.5)
+            controls = Controls(max(-1, min(1, round(ax))), max(-1, min(1, round(ay))),
+                                p.x + aim_x / d * 100 - cam.x + cam.frame_shake_x,
+                                p.y + aim_y / d * 100 - cam.y + cam.frame_shake_y,
+                                fire > 0.5, grenade > 0.5)
+            random.setstate(self.rng_states[i])
+            for _ in range(self.frame_skip):
+                game.step(dt, controls)
+                self.ticks[i] += 1
+                if game.player.hp <= 0 or self.ticks[i] >= self.max_ticks:
+                    self.dones[i] = True
+                    break
+            self.rng_states[i] = random.getstate()
+            self.rewards[i] = game.player.points - self.last_points[i]
+            self.last_points[i] = game.player.points
+            if self.dones[i]:
+                self.final_points[i] = game.player.points
+                self.final_wave[i] = game.director.wave
+                self._start(i)
+            self._observe(i)
+        random.setstate(outer)
+        # Final score / wave of the games that ended this step (where dones is set)
+        info = {"final_points": self.final_points, "final_wave": self.final_wave}
+        return self.obs, self.rewards, self.dones, info
+
+    def _observe(self, i):
+        """Write game i's observation into row i of the batch arrays"""
+        game, obs = self.games[i], self.obs
+        p = game.player
+        px, py = p.x, p.y
+        tx, ty = int(px // TILE), int(py // TILE)
+        s = 2 * self.view + 1
+        # Padding shifts the window by view tiles, so the crop centered on tx, ty starts at tx, ty
+        obs["grid"][i] = self.padded[i][ty:ty + s, tx:tx + s]
+
+        rows = obs["enemies"][i]
+        enemies = game.enemies
+        if len(enemies) > len(rows):
+            enemies = sorted(enemies, key=lambda e: (e.x - px)**2 + (e.y - py)**2)[:len(rows)]
+        n = len(enemies)
+        if n:
+            rows[:n] = [(e.x - px, e.y - py, ENEMY_KINDS.index(e.kind), e.hp) for e in enemies]
+        rows[n:] = 0.0
+        obs["n_enemies"][i] = n
+
+        rows = obs["bullets"][i]
+        bullets = game.bullets
+        if len(bullets) > len(rows):
+            bullets = sorted(bullets, key=lambda b: (b.x - px)**2 + (b.y - py)**2)[:len(rows)]
+        n = len(bullets)
+        if n:
+            rows[:n] = [(b.x - px, b.y - py, b.vx, b.vy, b.owner != "player") for b in bullets]
+        rows[n:] = 0.0
+        obs["n_bullets"][i] = n
+
+        obs["player"][i] = (p.hp, p.shield, p.grenades, MAX_STIMS - p.stims_used, p.combo,
+                            game.director.wave, p.vx, p.vy)
@@ -0,0 +1,283 @@
+"""
+Binary arena format and map cache for Hive City Rampage
+Versioned .hcra files holding every Arena layer, loaded with one bulk read or mmap
+"""
+
+import array
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+
+from constants import WORLD_W, WORLD_H, ARENA_SEED, MAP_FILE, MAP_CACHE_DIR, ARENA_GENERATOR
+from world import Arena, new_arena, GENERATOR_VERSION
+from tracing import span
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MAGIC = b"HCRA"
+FORMAT_VERSION = 1
+
+# magic, format version, generator version, generator name, seed (-1 = none), w, h, has rng state
+HEADER = struct.Struct("<4sHH16sqIIB3x")
+# floor tiles, rooms, then one count per sparse layer
+COUNTS = struct.Struct("<7I")
+# Sparse layers in file order; values are u8 (string layers via a name table)
+SPARSE = ("wall_elements", "tile_decals", "hazard_tiles", "animated_tiles", "props")
+RNG_WORDS = 625  # random.getstate() internal state + position
+# Next to the game, not the working directory, so every launch shares one cache
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), MAP_CACHE_DIR)
+
+
+class MapFormatError(Exception):
+    """Raised for files that aren't a readable .hcra arena"""
+
+
+def _pad4(n):
+    return (4 - n % 4) % 4
+
+
+def _u32(values):
+    a = array.array("I", values)
+    assert a.itemsize == 4
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _read_u32(buf, off, n):
+    if np is not None:
+        return np.frombuffer(buf, "<u4", n, off)
+    a = array.array("I")
+    a.frombytes(bytes(buf[off:off + 4*n]))
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def generator_name(arena):
+    """Name stored in the file / cache key for the generator that built an arena"""
+    if hasattr(arena, "generator"):
+        return arena.generator  # loaded from a file
+    return "numpy" if hasattr(arena, "solid_np") else "python"
+
+
+def arena_to_bytes(arena, rng_state=None):
+    """Encode an arena in the .hcra format
+
+    rng_state is random.getstate() right after generation; storing it lets a
+    load leave the global RNG exactly where a fresh generation would.
+    """
+    w, h = arena.w, arena.h
+    names = {}
+    sparse = []
+    for layer in SPARSE:
+        items = getattr(arena, layer)
+        if layer == "wall_elements":
+            values = list(items.values())
+        else:
+            table = names[layer] = sorted(set(items.values()))
+            ids = {name: i for i, name in enumerate(table)}
+            values = [ids[v] for v in items.values()]
+        sparse.append(([ty*w + tx for tx, ty in items], values))
+    names_b = json.dumps(names).encode()
+
+    seed = arena.seed if isinstance(arena.seed, int) else -1
+    parts = [
+        HEADER.pack(MAGIC, FORMAT_VERSION, GENERATOR_VERSION, generator_name(arena).encode(),
+                    seed, w, h, rng_state is not None),
+        COUNTS.pack(len(arena.floor), len(arena.rooms), *(len(idx) for idx, _ in sparse)),
+        struct.pack("<I", len(names_b)), names_b, b"\0" * _pad4(len(names_b)),
+    ]
+    for grid in (arena.solid, arena.wall_variants, arena.floor_variants):
+        parts.append(b"".join(bytes(row) for row in grid))
+    parts.append(b"\0" * _pad4(3 * w * h))
+    for idx, values in sparse:
+        parts += [_u32(idx), bytes(values), b"\0" * _pad4(len(values))]
+    parts.append(_u32([v & 0xFFFFFFFF for room in arena.rooms for v in room]))
+    parts.append(_u32([ty*w + tx for tx, ty in arena.floor]))
+    if rng_state is not None:
+        parts.append(_u32(rng_state[1]))
+    return b"".join(parts)
+
+
+def save_arena(arena, path, rng_state=None):
+    """Write an arena to path (see arena_to_bytes)"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(arena_to_bytes(arena, rng_state))
+    os.replace(tmp, path)
+
+
+def load_arena(path, use_mmap=False):
+    """Read an arena written by save_arena
+
+    The file is taken in with a single read (or mapped with use_mmap, in
+    which case the NumPy layers are read-only views into the mapping). With
+    NumPy available the result is a NumpyArena with its render masks rebuilt.
+    """
+    with span("mapfile.load", "arena"):
+        with open(path, "rb") as f:
+            if use_mmap:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+        return _decode(memoryview(buf), buf if use_mmap else None)
+
+
+def arena_from_bytes(data):
+    """Decode an arena produced by arena_to_bytes"""
+    with span("mapfile.decode", "arena"):
+        return _decode(memoryview(data), None)
+
+
+def _decode(mv, mapping):
+    if len(mv) < HEADER.size + COUNTS.size:
+        raise MapFormatError("file too short")
+    magic, fmt, gen_version, gen_name, seed, w, h, has_rng = HEADER.unpack_from(mv, 0)
+    if magic != MAGIC:
+        raise MapFormatError("not an arena file")
+    if fmt != FORMAT_VERSION:
+        raise MapFormatError(f"unsupported format version {fmt}")
+    off = HEADER.size
+    counts = COUNTS.unpack_from(mv, off)
+    n_floor, n_rooms, sparse_n = counts[0], counts[1], counts[2:]
+    off += COUNTS.size
+    (names_len,) = struct.unpack_from("<I", mv, off)
+    off += 4
+    names = json.loads(bytes(mv[off:off + names_len]))
+    off += names_len + _pad4(names_len)
+
+    if np is not None:
+        from arena_np import NumpyArena, tile_masks
+        arena = NumpyArena.__new__(NumpyArena)
+    else:
+        arena = Arena.__new__(Arena)
+    arena.seed = None if seed == -1 else seed
+    arena.w, arena.h = w, h
+    arena.generator = gen_name.rstrip(b"\0").decode()
+    arena.generator_version = gen_version
+    arena.connectivity = {}
+
+    # Grids
+    grids = []
+    for i in range(3):
+        start = off + i * w * h
+        if np is not None:
+            grids.append(np.frombuffer(mv, np.uint8, w * h, start).reshape(h, w))
+        else:
+            grids.append([list(mv[start + ty*w:start + (ty + 1)*w]) for ty in range(h)])
+    off += 3 * w * h + _pad4(3 * w * h)
+    if np is not None:
+        arena.solid_np = grids[0]
+        grids = [g.tolist() for g in grids]
+    arena.solid, arena.wall_variants, arena.floor_variants = grids
+
+    # Sparse layers
+    for layer, n in zip(SPARSE, sparse_n):
+        idx = _read_u32(mv, off, n)
+        off += 4 * n
+        values = list(mv[off:off + n])
+        off += n + _pad4(n)
+        if layer in names:
+            table = names[layer]
+            values = [table[v] for v in values]
+        if np is not None:
+            keys = zip((idx % w).tolist(), (idx // w).tolist())
+        else:
+            keys = ((i % w, i // w) for i in idx)
+        setattr(arena, layer, dict(zip(keys, values)))
+
+    rooms = _read_u32(mv, off, 4 * n_rooms)
+    off += 16 * n_rooms
+    rooms = [v - (1 << 32) if v >= 1 << 31 else v for v in (rooms.tolist() if np is not None else rooms)]
+    arena.rooms = [tuple(rooms[i:i + 4]) for i in range(0, len(rooms), 4)]
+
+    floor = _read_u32(mv, off, n_floor)
+    off += 4 * n_floor
+    if np is not None:
+        arena.floor = list(zip((floor % w).tolist(), (floor // w).tolist()))
+    else:
+        arena.floor = [(i % w, i // w) for i in floor]
+
+    if has_rng:
+        state = _read_u32(mv, off, RNG_WORDS)
+        state = state.tolist() if np is not None else list(state)
+        random.setstate((3, tuple(state), None))
+    elif arena.seed is not None:
+        random.seed(arena.seed)
+
+    if np is not None:
+        arena.interior_np, arena.neighbor_mask_np, arena.diagonal_mask_np = tile_masks(arena.solid_np)
+        arena.interior = arena.interior_np.tolist()
+        arena.neighbor_masks = arena.neighbor_mask_np.tolist()
+        arena.diagonal_masks = arena.diagonal_mask_np.tolist()
+    if mapping is not None:
+        arena.mapping = mapping  # keep the views' backing mapping alive
+    return arena
+
+
+# -------------------- CACHE --------------------
+def _expected_generator():
+    """Generator new_arena() will actually use"""
+    if ARENA_GENERATOR == "numpy" and np is not None:
+        return "numpy"
+    return "python"
+
+
+def cache_path(seed, w, h):
+    """Cache file for a seed under the current generator and version"""
+    name = f"{_expected_generator()}-v{GENERATOR_VERSION}-{w}x{h}-{seed}.hcra"
+    return os.path.join(CACHE_DIR, name)
+
+
+def cached_arena(seed, w=None, h=None):
+    """Load the arena for a seed from the cache, generating and storing it on a miss"""
+    w, h = w or WORLD_W, h or WORLD_H
+    path = cache_path(seed, w, h)
+    if os.path.exists(path):
+        try:
+            return load_arena(path)
+        except (MapFormatError, OSError, struct.error, ValueError):
+            pass  # stale or damaged entry: regenerate over it
+    arena = new_arena(seed, w, h)
+    if isinstance(arena, Arena):
+        state = random.getstate()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        save_arena(arena, path, state)
+    return arena
+
+
+def arena_for_run():
+    """Arena for a new run: MAP_FILE if set, else the cache for ARENA_SEED, else a fresh one"""
+    if MAP_FILE:
+        return load_arena(MAP_FILE)
+    if ARENA_SEED is not None:
+        return cached_arena(ARENA_SEED)
+    return new_arena()
+
+
+if __name__ == "__main__":
+    # Export a seed as a curated map file: python mapfile.py SEED [OUT.hcra]
+    import time
+
+    if len(sys.argv) < 2:
+        print("Usage: python mapfile.py SEED [OUT.hcra]")
+        sys.exit(1)
+    seed = int(sys.argv[1])
+    out = sys.argv[2] if len(sys.argv) > 2 else f"arena_{seed}.hcra"
+    t0 = time.perf_counter()
+    arena = new_arena(seed)
+    t1 = time.perf_counter()
+    save_arena(arena, out, random.getstate())
+    t2 = time.perf_counter()
+    load_arena(out)
+    t3 = time.perf_counter()
+    print(f"{out}: {os.path.getsize(out)} bytes, generate {1000*(t1-t0):.1f} ms, "
+          f"save {1000*(t2-t1):.1f} ms, load {1000*(t3-t2):.1f} ms")
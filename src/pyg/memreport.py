@@ -0,0 +1,120 @@
+"""
+Memory usage reporting for Hive City Rampage
+tracemalloc allocations grouped by game module, container sizes and sprite pixel bytes
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from constants import MEM_REPORT_INTERVAL, MEM_REPORT_LOG, MEM_REPORT_FRAMES
+from assets import owned_bytes
+
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+# Next to the game, not the working directory (where .gitignore expects it)
+LOG_PATH = os.path.join(GAME_DIR, MEM_REPORT_LOG)
+
+
+def frames_bytes(frames):
+    """Pixel bytes held by a list of frames"""
+    return sum(owned_bytes(f) for f in frames)
+
+
+def container_bytes(items):
+    """Shallow size of a list of entities: the list plus each object and its __dict__"""
+    total = sys.getsizeof(items)
+    for o in items:
+        total += sys.getsizeof(o)
+        d = getattr(o, "__dict__", None)
+        if d is not None:
+            total += sys.getsizeof(d)
+    return total
+
+
+def _module_of(filename):
+    """Map a traceback filename to a report group"""
+    if filename.startswith("<"):
+        return "other"
+    path = os.path.abspath(filename)
+    if os.path.dirname(path) == GAME_DIR:
+        return os.path.splitext(os.path.basename(path))[0]
+    if os.sep + "pygame" + os.sep in path:
+        return "pygame"
+    return "other"
+
+
+class MemoryReporter:
+    """Periodic memory snapshots appended to a JSON-lines log
+
+    Python allocations are attributed to the game module that made them
+    (entities, world, assets, hive_city_rampage, ...). Surface pixel buffers
+    live in SDL's heap where tracemalloc can't see them, so sprite memory is
+    reported separately from the surfaces themselves.
+    """
+    def __init__(self, path=LOG_PATH, interval=MEM_REPORT_INTERVAL, frames=MEM_REPORT_FRAMES):
+        self.path = path
+        self.interval = interval
+        self.t = 0.0
+        self.t0 = time.time()
+        self.prev = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.log = open(path, "a")
+
+    def due(self, dt):
+        """Advance the timer; True when a snapshot should be taken"""
+        self.t += dt
+        if self.t < self.interval:
+            return False
+        self.t = 0.0
+        return True
+
+    def snapshot(self, containers, sprite_bank=None, frame_lists=None):
+        """Take a snapshot and append it to the log
+
+        containers: name -> list of entities (enemies, bullets, ...)
+        frame_lists: name -> list of surfaces sliced outside the SpriteBank
+        """
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        modules = {}
+        for stat in snap.statistics("filename"):
+            group = _module_of(stat.traceback[0].filename)
+            size, count = modules.get(group, (0, 0))
+            modules[group] = (size + stat.size, count + stat.count)
+
+        current, peak = tracemalloc.get_traced_memory()
+        record = {
+            "t": round(time.time() - self.t0, 1),
+            "traced": current,
+            "peak": peak,
+            "modules": {
+                name: {"bytes": size, "blocks": count, "delta": size - self.prev.get(name, size)}
+                for name, (size, count) in sorted(modules.items(), key=lambda kv: -kv[1][0])
+            },
+            "containers": {
+                name: {"len": len(items), "bytes": container_bytes(items)}
+                for name, items in containers.items()
+            },
+        }
+        if sprite_bank is not None:
+            sheet_b, frame_b = sprite_bank.pixel_bytes()
+            record["sprite_bank"] = {"sheets": sheet_b, "frames": frame_b,
+                                     "view_bytes": sprite_bank.view_bytes, "shared_frames": sprite_bank.shared}
+        if frame_lists:
+            record["frame_lists"] = {name: frames_bytes(frames) for name, frames in frame_lists.items()}
+        self.prev = {name: size for name, (size, _) in modules.items()}
+
+        self.log.write(json.dumps(record) + "\n")
+        self.log.flush()
+        return record
+
+    def close(self):
+        """Stop tracing and close the log"""
+        self.log.close()
+        tracemalloc.stop()
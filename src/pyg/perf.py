@@ -0,0 +1,139 @@
+"""
+Performance overlay for Hive City Rampage
+Rolling per-subsystem frame timings, frame-time graph and entity counts
+"""
+
+import time
+from collections import deque
+import pygame as pg
+
+from constants import PERF_HISTORY, FPS
+
+
+# Frame phases in the order the main loop runs them
+PERF_SECTIONS = (
+    "events", "player", "director", "bullets", "enemies",
+    "pickups/fx", "tiles", "decals", "entities", "hud", "flip",
+)
+
+
+class PerfOverlay:
+    """Toggleable profiler overlay
+
+    The main loop calls lap(name) at the end of each phase; the time since the
+    previous lap is charged to that phase. While disabled every call returns
+    immediately, so the instrumentation costs nothing when the overlay is off.
+    Laps are also forwarded to a tracing.Tracer as phase spans when it records.
+    """
+    def __init__(self, history=PERF_HISTORY, tracer=None):
+        self.enabled = False
+        self.tracer = tracer
+        self.history = history
+        self.samples = {name: deque(maxlen=history) for name in PERF_SECTIONS}
+        self.frame_ms = deque(maxlen=history)
+        self.cur = dict.fromkeys(PERF_SECTIONS, 0.0)
+        self.t = 0.0
+        self.frame_t0 = 0.0
+
+    def toggle(self):
+        """Turn the overlay on/off (history is dropped so stale data never shows)
+
+        Also call begin_frame() after toggling the tracer mid-frame, so the
+        first phase span doesn't stretch back to the last traced frame.
+        """
+        self.enabled = not self.enabled
+        for d in self.samples.values():
+            d.clear()
+        self.frame_ms.clear()
+        self.begin_frame()
+
+    def _active(self):
+        return self.enabled or (self.tracer is not None and self.tracer.enabled)
+
+    def begin_frame(self):
+        """Start timing a new frame (call right after clock.tick)"""
+        if not self._active():
+            return
+        for name in self.cur:
+            self.cur[name] = 0.0
+        self.t = self.frame_t0 = time.perf_counter()
+
+    def lap(self, name):
+        """Charge time since the previous lap to a phase"""
+        if not self._active():
+            return
+        now = time.perf_counter()
+        self.cur[name] += now - self.t
+        if self.tracer is not None:
+            self.tracer.complete(name, self.t, now)
+        self.t = now
+
+    def end_frame(self, dt):
+        """Commit this frame's phase timings and total frame time (dt in seconds)
+
+        Returns the path of a trace dump if this frame breached the spike threshold.
+        """
+        if not self._active():
+            return None
+        if self.enabled:
+            for name, v in self.cur.items():
+                self.samples[name].append(v * 1000.0)
+            self.frame_ms.append(dt * 1000.0)
+        if self.tracer is not None:
+            return self.tracer.end_frame(self.frame_t0, time.perf_counter())
+        return None
+
+    def draw(self, screen, font, clock, counts):
+        """Draw timings table, frame-time graph and entity counts"""
+        if not self.enabled or not self.frame_ms:
+            return
+        count_rows = (len(counts) + 1) // 2
+        panel = pg.Rect(screen.get_width() - 290, 80, 280, 24 + 16 * (len(PERF_SECTIONS) + 2) + 60 + 16 * count_rows)
+        bg = pg.Surface(panel.size, pg.SRCALPHA)
+        bg.fill((0, 0, 0, 170))
+        screen.blit(bg, panel)
+
+        x, y = panel.x + 8, panel.y + 6
+        n = len(self.frame_ms)
+        avg_frame = sum(self.frame_ms) / n
+        screen.blit(font.render(f"FPS {clock.get_fps():5.1f}  frame {avg_frame:5.2f} ms", True, (255, 220, 100)), (x, y))
+        y += 20
+
+        # Rolling per-phase averages
+        work = 0.0
+        for name in PERF_SECTIONS:
+            d = self.samples[name]
+            ms = sum(d) / len(d) if d else 0.0
+            work += ms
+            self._row(screen, font, name, f"{ms:.2f} ms", x, y, (200, 200, 200))
+            y += 16
+        self._row(screen, font, "work", f"{work:.2f} ms", x, y, (255, 255, 255))
+        y += 22
+
+        # Frame-time graph, with a line at the frame budget
+        gw, gh = panel.w - 16, 50
+        graph = pg.Rect(x, y, gw, gh)
+        pg.draw.rect(screen, (40, 40, 40), graph)
+        budget = 1000.0 / FPS
+        scale = gh / (budget * 2)
+        by = graph.bottom - int(budget * scale)
+        pg.draw.line(screen, (90, 160, 90), (graph.x, by), (graph.right - 1, by))
+        step = gw / self.history
+        for i, ms in enumerate(self.frame_ms):
+            h = min(gh, int(ms * scale))
+            color = (120, 200, 120) if ms <= budget * 1.1 else (230, 90, 70)
+            gx = graph.x + int(i * step)
+            pg.draw.line(screen, color, (gx, graph.bottom - 1), (gx, graph.bottom - h))
+        y += gh + 8
+
+        # Entity counts, two columns
+        cw = (panel.w - 16) // 2
+        for i, (name, count) in enumerate(counts.items()):
+            self._row(screen, font, name, str(count), x + (i % 2) * (cw + 8), y + (i // 2) * 16,
+                      (180, 200, 230), cw - 8)
+
+    def _row(self, screen, font, label, value, x, y, color, w=None):
+        """Draw a label with its value right-aligned in a w-wide column (default: the panel)"""
+        screen.blit(font.render(label, True, color), (x, y))
+        img = font.render(value, True, color)
+        screen.blit(img, (x + (w or 264) - img.get_width(), y))
@@ -0,0 +1,81 @@
+"""
+Background arena pre-generation for Hive City Rampage
+Builds the next run's arena in a worker process so restarting doesn't hitch
+"""
+
+import multiprocessing as mp
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import WORLD_MODE, PREGEN_ENABLED
+from mapfile import arena_for_run, arena_to_bytes, arena_from_bytes
+from tracing import span
+
+
+def _build():
+    """Worker side: build the next arena and send it back as .hcra bytes"""
+    arena = arena_for_run()
+    return arena_to_bytes(arena, random.getstate())
+
+
+class ArenaPrefetcher:
+    """Keeps one arena generating in a background process during play
+
+    The worker is a separate process rather than a thread so generation
+    doesn't compete with the render loop for the GIL. The arena crosses the
+    process boundary in the mapfile format (with the worker's RNG state), so
+    a hand-off is just a decode and leaves random where a local build would.
+    Stream-mode arenas build their chunks lazily and aren't prefetched.
+    The pool (and the resource tracker process it brings along) is only
+    created by the first request(), so the game can hold off spawning
+    anything until it is up and showing frames.
+    """
+    def __init__(self, enabled=PREGEN_ENABLED):
+        self.enabled = enabled and WORLD_MODE != "stream"
+        self.pool = None
+        self.pending = None
+        self.last_ms = 0.0
+        self.last_source = None
+
+    def request(self):
+        """Start building the next arena if one isn't already on the way"""
+        if not self.enabled or self.pending is not None:
+            return
+        if self.pool is None:
+            # spawn, not fork: the parent already holds an SDL window
+            self.pool = ProcessPoolExecutor(1, mp_context=mp.get_context("spawn"))
+        self.pending = self.pool.submit(_build)
+
+    def take(self):
+        """Arena for the next run: the prefetched one if ready, else built here
+
+        An unfinished prefetch is left running for the following restart.
+        The hand-off time is kept in last_ms and last_source.
+        """
+        t0 = time.perf_counter()
+        arena = None
+        with span("pregen.take", "arena"):
+            fut = self.pending
+            if fut is not None and fut.done():
+                self.pending = None
+                try:
+                    arena = arena_from_bytes(fut.result())
+                    self.last_source = "prefetched"
+                except Exception as e:
+                    print(f"Arena pre-generation failed ({e!r}), generating in-process")
+                    self.close()
+            if arena is None:
+                arena = arena_for_run()
+                self.last_source = "generated"
+            self.request()
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        return arena
+
+    def close(self):
+        """Stop the worker process (for good: later requests do nothing)"""
+        self.enabled = False
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            self.pending = None
@@ -0,0 +1,167 @@
+"""
+Sprite render queue for Hive City Rampage
+Culls world-space sprites against the view, submits them grouped by surface through Surface.blits,
+and caches pre-rendered primitive shapes
+"""
+
+from collections import OrderedDict
+
+import pygame as pg
+
+from constants import PRIMITIVE_CACHE_SIZE
+from assets import blit_source
+
+
+# Pickup body / inner ring colors
+PICKUP_COLORS = {
+    "health": ((255, 80, 80), (255, 200, 200)),
+    "shield": ((80, 180, 255), (200, 230, 255)),
+    "grenade": ((100, 140, 100), (150, 200, 150)),
+}
+
+
+class RenderQueue:
+    """Per-frame list of centered sprite draws
+
+    push() takes world coordinates, drops sprites outside the view and
+    buckets the rest by layer, then by surface. flush() sends everything
+    queued in one Surface.blits() call: layers in ascending order, and
+    within a layer all copies of one surface back to back. Draw order
+    inside a layer is therefore not kept, so anything that must stack
+    goes on its own layer. Frames that are views into a sheet are blitted
+    from the sheet with an area rect.
+
+    Counters (reset by begin()): draws = sprites blitted, batches = blits()
+    calls, culled = sprites skipped as off-view.
+    """
+    def __init__(self, view_w, view_h):
+        self.view_w = view_w
+        self.view_h = view_h
+        self.ox = 0.0
+        self.oy = 0.0
+        self.layers = {}  # layer -> {surface: [half_w, half_h, [dest, ...]]}
+        self.draws = 0
+        self.batches = 0
+        self.culled = 0
+
+    def begin(self, camera):
+        """Start a frame: take the camera offset (with shake) and reset counters"""
+        self.ox = camera.frame_shake_x - camera.x
+        self.oy = camera.frame_shake_y - camera.y
+        self.layers.clear()
+        self.draws = self.batches = self.culled = 0
+
+    def to_screen(self, x, y):
+        """World to screen coordinates (same as Camera.apply_xy)"""
+        return x + self.ox, y + self.oy
+
+    def cull(self, x, y, r):
+        """True (and counted) if a radius-r shape at world x, y is off-view"""
+        sx, sy = x + self.ox, y + self.oy
+        if sx + r < 0 or sy + r < 0 or sx - r > self.view_w or sy - r > self.view_h:
+            self.culled += 1
+            return True
+        return False
+
+    def push(self, img, x, y, layer=0):
+        """Queue img centered on world x, y"""
+        groups = self.layers.get(layer)
+        if groups is None:
+            groups = self.layers[layer] = {}
+        group = groups.get(img)
+        if group is None:
+            w, h = img.get_size()
+            group = groups[img] = [w // 2, h // 2, []]
+        hw, hh, dests = group
+        sx, sy = int(x + self.ox), int(y + self.oy)
+        if sx + hw < 0 or sy + hh < 0 or sx - hw > self.view_w or sy - hh > self.view_h:
+            self.culled += 1
+            return
+        dests.append((sx - hw, sy - hh))
+
+    def flush(self, screen, formats=None):
+        """Blit everything queued so far and empty the queue (tallied into formats, an assets.FormatStats)"""
+        if not self.layers:
+            return
+        seq = []
+        for layer in sorted(self.layers):
+            for img, (_, _, dests) in self.layers[layer].items():
+                src, area = blit_source(img)
+                seq.extend([(src, d, area) for d in dests])
+        self.layers.clear()
+        if seq:
+            screen.blits(seq, doreturn=False)
+            if formats is not None:
+                formats.count_blits(seq)
+            self.draws += len(seq)
+            self.batches += 1
+
+
+# -------------------- PRIMITIVE SPRITES --------------------
+def _render_pickup(kind, size):
+    """Pickup disc of radius size, centered on the surface"""
+    color, inner = PICKUP_COLORS[kind]
+    surf = pg.Surface((2*size + 1, 2*size + 1), pg.SRCALPHA)
+    c = (size, size)
+    pg.draw.circle(surf, color, c, size)
+    pg.draw.circle(surf, inner, c, size - 3)
+    if kind == "health":
+        # Cross symbol
+        pg.draw.rect(surf, color, (size - 4, size - 1, 8, 2))
+        pg.draw.rect(surf, color, (size - 1, size - 4, 2, 8))
+    return surf
+
+
+def _render_placeholder(color, size):
+    """Rounded square with a black outline"""
+    surf = pg.Surface((size, size), pg.SRCALPHA)
+    pg.draw.rect(surf, color, surf.get_rect(), border_radius=6)
+    pg.draw.rect(surf, (0, 0, 0), surf.get_rect(), 2, border_radius=6)
+    return surf
+
+
+def _render_dot(color, r):
+    """Filled circle of radius r"""
+    surf = pg.Surface((2*r + 1, 2*r + 1), pg.SRCALPHA)
+    pg.draw.circle(surf, color, (r, r), r)
+    return surf
+
+
+class PrimitiveCache:
+    """LRU of pre-rendered primitive shapes keyed by their parameters
+
+    Pickups pulse through a handful of integer radii and placeholders come
+    in a few colors and sizes, so after the first frames every one of them
+    is a cached surface and drawing it is a single blit.
+    """
+    def __init__(self, capacity=PRIMITIVE_CACHE_SIZE):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, build, *key):
+        """Cached build(*key), rendering it on a miss"""
+        k = (build, *key)
+        surf = self.items.get(k)
+        if surf is not None:
+            self.items.move_to_end(k)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.items[k] = build(*key)
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+        return surf
+
+    def pickup(self, kind, size):
+        """Pickup disc (health, shield or grenade) of radius size"""
+        return self.get(_render_pickup, kind, size)
+
+    def placeholder(self, color, size):
+        """Placeholder square for a missing animation"""
+        return self.get(_render_placeholder, tuple(color), size)
+
+    def dot(self, color, r):
+        """Plain circle (bullets without a sprite)"""
+        return self.get(_render_dot, tuple(color), r)
@@ -0,0 +1,488 @@
+"""
+Game simulation for Hive City Rampage
+One gameplay tick (movement, combat, AI, pickups) with no drawing, so it can run in any process
+"""
+
+import math
+import random
+from collections import namedtuple
+
+from constants import *
+from utils import *
+from world import Camera
+from entities import *
+from director import Director
+from combat import DamageQueue
+from timers import TimerWheel
+from spatial import SpatialGrid, DensityField
+from ai import assist_aim
+
+
+# One tick of player input: movement axes (-1..1), the aim point in
+# screen (render) coordinates and the held fire / grenade buttons
+Controls = namedtuple("Controls", "ax ay aim_x aim_y fire grenade")
+NO_INPUT = Controls(0, 0, W / 2, H / 2, False, False)
+
+# What the renderer needs from a tick. Entity groups are rows of
+# (x, y, kind, phase); see Game.scene() for what kind and phase hold.
+Scene = namedtuple("Scene", "now camera player wave state bullets pickups enemies corpses vfx explosions marks counts")
+
+# Kind codes used in scene rows (and snapshot records)
+PICKUP_KINDS = ("health", "shield", "grenade")
+ENEMY_KINDS = ("grunt", "runner", "shooter", "brute")
+VFX_KINDS = ("shockwave", "smoke")
+DECAL_KINDS = ("shell_casing", "scorch_mark", "debris", "blood_pool")
+CROWD_SOLVERS = ("pairwise", "density")
+
+# Enemy separation (radius px, force): runners keep 32 px from everything, the rest 56 px
+SEP_RUNNER = (32, 2.0)
+SEP_DEFAULT = (56, 4.5)
+
+
+def anim_code(kind, state):
+    """Enemy kind and animation state packed into one row value (see split_anim_code)"""
+    return state * len(ENEMY_KINDS) + ENEMY_KINDS.index(kind)
+
+
+def split_anim_code(code):
+    """(kind, state) back from anim_code()"""
+    state, kind = divmod(int(code), len(ENEMY_KINDS))
+    return ENEMY_KINDS[kind], state
+
+
+def _no_lap(name):
+    pass
+
+
+class Game:
+    """All gameplay state and the per-tick update
+
+    step() advances everything by dt given one tick of Controls; nothing
+    here draws or reads pygame input, so the same code runs in the main
+    loop, in the simulation process or headless. Decal stamps are queued
+    in marks (kind, x, y, spread) and, like kills and loaded/evicted (the
+    chunks streaming brought in or dropped), only cover the latest step.
+    """
+    def __init__(self, arena, perf=None, crowd=CROWD_SOLVER):
+        self.lap = perf.lap if perf is not None else _no_lap
+        self.crowd_solver = crowd  # one of CROWD_SOLVERS, may be switched between ticks
+        self.density = {SEP_RUNNER: DensityField(SEP_RUNNER[0]), SEP_DEFAULT: DensityField(SEP_DEFAULT[0])}
+        self.camera = Camera()
+        self.damage = DamageQueue()
+        self.grid = SpatialGrid()  # enemies as of the end of the last tick (aim assist)
+        # Game clock and lifetime expirations for bullets, pickups and effects
+        self.now = 0.0
+        self.timers = TimerWheel(1.0 / FPS)
+        self.enemies = []
+        self.bullets = []
+        self.pickups = []
+        self.explosions = []
+        self.vfx = []
+        self.corpses = []
+        self.marks = []
+        self.kills = []
+        self.loaded = self.evicted = ()
+        self.reset(arena)
+
+    def reset(self, arena):
+        """Start a new run on arena (the game clock keeps running)"""
+        self.arena = arena
+        self.player = Player(arena.w*TILE/2, arena.h*TILE/2)
+        self.enemies.clear(); self.bullets.clear(); self.pickups.clear()
+        self.explosions.clear(); self.vfx.clear(); self.corpses.clear(); self.marks.clear()
+        self.director = Director()
+        self.damage.clear()
+        self.timers.clear()
+        self.grid.rebuild(())
+        camera = self.camera
+        camera.shake_t = 0; camera.shake_pow = 0; camera.shake_seed = 0
+
+    def spawn(self, items, obj):
+        """Add a short-lived object to its list and schedule its expiry"""
+        items.append(obj)
+        self.timers.schedule(obj.born + obj.life, (items, obj))
+
+    def step(self, dt, controls):
+        """Advance the game by dt seconds"""
+        self.now += dt
+        now = self.now
+        arena, player, camera = self.arena, self.player, self.camera
+        director, damage, spawn = self.director, self.damage, self.spawn
+        enemies, bullets, pickups = self.enemies, self.bullets, self.pickups
+        explosions, vfx = self.explosions, self.vfx
+        marks = self.marks = []
+
+        # Stream world chunks around the player (no-op for a fully generated Arena)
+        self.loaded, self.evicted = arena.stream(player.x, player.y)
+        if self.evicted:
+            # Anything left on an evicted chunk can no longer collide or be drawn
+            enemies[:] = [e for e in enemies if arena.is_resident_px(e.x, e.y)]
+            bullets[:] = [b for b in bullets if arena.is_resident_px(b.x, b.y)]
+            pickups[:] = [p for p in pickups if arena.is_resident_px(p.x, p.y)]
+        self.lap("events")
+
+        # Expire whatever's lifetime ran out, then compact only the lists that changed
+        expired_lists = {}
+        for items, obj in self.timers.advance(now):
+            if not obj.expired:
+                obj.expired = True
+                expired_lists[id(items)] = items
+        for items in expired_lists.values():
+            items[:] = [o for o in items if not o.expired]
+
+        if player.hp > 0:
+            # Movement input
+            ax, ay = controls.ax, controls.ay
+
+            if ax or ay:
+                sx = 1 if ax > 0 else -1 if ax < 0 else 0
+                sy = 1 if ay > 0 else -1 if ay < 0 else 0
+                if sx or sy:
+                    player.face = (sx, sy)
+
+            # Apply acceleration with diagonal compensation
+            if ax and ay:
+                # For diagonal movement, normalize the input to maintain consistent speed
+                # sqrt(2) normalization prevents slowdown on diagonals
+                diag_factor = 0.7071  # 1/sqrt(2)
+                player.vx += ax * PLAYER_ACC * diag_factor * 1.4  # Extra boost for diagonals
+                player.vy += ay * PLAYER_ACC * diag_factor * 1.4
+            else:
+                player.vx += ax * PLAYER_ACC
+                player.vy += ay * PLAYER_ACC
+
+            # Speed clamping
+            sp = math.hypot(player.vx, player.vy)
+            if sp > PLAYER_MAX:
+                s = PLAYER_MAX / sp
+                player.vx *= s
+                player.vy *= s
+
+            # Reduced turn drag for snappier controls
+            if (ax and abs(player.vy) > 80) or (ay and abs(player.vx) > 80):
+                player.vx *= 0.92  # less drag for quicker direction changes
+                player.vy *= 0.92
+
+            player.vx *= PLAYER_FRIC
+            player.vy *= PLAYER_FRIC
+            player.try_move(arena, player.vx*dt, player.vy*dt)
+
+            moving = (abs(player.vx) + abs(player.vy)) > 60  # adjusted for higher speed
+            if moving:
+                player.walk_phase += dt
+                # Footstep shake (matching PICO-8 prototype)
+                player.step_t += 1
+                if player.step_t >= 14:
+                    player.step_t = 0
+                    camera.add_shake(0.6, 4)  # subtle footstep shake
+            else:
+                player.step_t = 0
+
+            # Aim at the pointer: screen position to world position
+            world_mx = controls.aim_x + camera.x - camera.frame_shake_x
+            world_my = controls.aim_y + camera.y - camera.frame_shake_y
+            # Direction from player to mouse
+            ux, uy, _ = norm(world_mx - player.x, world_my - player.y)
+            if AIM_ASSIST:
+                ux, uy = assist_aim(player, self.grid, ux, uy)
+            player.aim = (ux, uy)
+            # Update face direction to match aim
+            player.face = (1 if ux > 0 else -1, 0)
+
+            # Shooting (left mouse button)
+            player.is_shooting = False
+            if player.cd > 0: player.cd -= 1
+            if controls.fire and player.cd <= 0:
+                player.cd = SHOT_COOLDOWN_FR
+                player.shoot_flash = 0.10
+                player.is_shooting = True
+                player.set_anim(ANIM_ATTACK, now)  # held fire keeps one clip running
+                player.shield_regen_timer = 0.0  # reset regen timer when shooting
+                bvx = player.aim[0] * 520
+                bvy = player.aim[1] * 520
+                spawn(bullets, Bullet(player.x, player.y, bvx, bvy, life=0.75, owner="player", born=now))
+                marks.append(("shell_casing", player.x, player.y, 10))
+                camera.add_shake(1.1, 8)  # halved for better feel
+            elif player.shoot_flash <= 0:
+                player.set_anim(ANIM_WALK if moving else ANIM_IDLE, now)
+
+            # Grenade throwing (space key)
+            if player.grenade_cd > 0:
+                player.grenade_cd -= dt
+            if controls.grenade and player.grenade_cd <= 0 and player.grenades > 0:
+                player.grenades -= 1
+                player.grenade_cd = GRENADE_COOLDOWN
+
+                # Create explosion at player position
+                spawn(explosions, Explosion(player.x, player.y, born=now))
+                marks.append(("scorch_mark", player.x, player.y, 0))
+                spawn(vfx, VFX(player.x, player.y, "shockwave", born=now))
+
+                # Damage and knockback all enemies in radius
+                for e in enemies:
+                    dx, dy = e.x - player.x, e.y - player.y
+                    d2 = dx*dx + dy*dy
+                    if d2 < GRENADE_RADIUS**2:
+                        damage.hit(e, GRENADE_DAMAGE, "grenade")
+                        # Knockback away from explosion
+                        kx, ky, d = norm(dx, dy)
+                        force = GRENADE_KNOCKBACK * (1 - d/GRENADE_RADIUS)
+                        e.knock_vx += kx * force
+                        e.knock_vy += ky * force
+                        # Add smoke effect on hit enemies
+                        spawn(vfx, VFX(e.x, e.y, "smoke", born=now))
+
+                # Big screen shake
+                damage.shake(12.0, 15, "grenade")
+
+            # Shield regeneration (continuous after delay when not shooting)
+            if not player.is_shooting and player.shield < player.max_shield:
+                player.shield_regen_timer += dt
+                if player.shield_regen_timer >= SHIELD_REGEN_DELAY:
+                    player.shield = min(player.max_shield, player.shield + SHIELD_REGEN_RATE * dt)
+
+            if player.ifr > 0: player.ifr -= 1
+            if player.dmg_cd > 0: player.dmg_cd -= 1
+            if player.shoot_flash > 0: player.shoot_flash -= dt
+        else:
+            player.set_anim(ANIM_DEATH, now)
+        self.lap("player")
+
+        # Director
+        prev_wave = director.wave
+        director.tick(dt, arena, player, enemies, camera, now)
+
+        # Wave completion bonus
+        if director.wave > prev_wave and player.hp > 0:
+            wave_bonus = WAVE_BONUS_BASE * prev_wave
+            player.points += wave_bonus
+        self.lap("director")
+
+        # Bullets update
+        for b in bullets[:]:
+            b.x += b.vx * dt
+            b.y += b.vy * dt
+            if arena.is_solid_px(b.x, b.y):
+                # Impact debris just in front of the wall
+                marks.append(("debris", b.x - b.vx * dt, b.y - b.vy * dt, 0))
+                b.expired = True
+                bullets.remove(b)
+                continue
+
+            if b.owner == "player":
+                for e in enemies:
+                    if dist2(b.x, b.y, e.x, e.y) < (18**2):
+                        damage.hit(e, 1, "bullet", shake=(0.9, 6))
+                        b.expired = True
+                        if b in bullets: bullets.remove(b)
+                        break
+            else:
+                # Enemy bullet hits player - damages shield first (3 per bullet)
+                if player.hp > 0 and dist2(b.x, b.y, player.x, player.y) < (18**2) and player.ifr <= 0:
+                    if player.shield > 0:
+                        player.shield = max(0, player.shield - 3)
+                    else:
+                        player.hp -= 1
+                    player.ifr = IFRAMES_FR
+                    camera.add_shake(2.6, 10)
+                    b.expired = True
+                    if b in bullets: bullets.remove(b)
+        self.lap("bullets")
+
+        # Enemies update
+        density = self.crowd_solver == "density"
+        if density:
+            # Splat where everyone starts the tick; each enemy reads the field at its own splat
+            for field in self.density.values():
+                field.rebuild(enemies)
+        for e in enemies:
+            dx, dy = player.x - e.x, player.y - e.y
+            ux, uy, d = norm(dx, dy)
+            ex, ey = e.x, e.y
+
+            # Apply and decay knockback velocity (smooth bounce)
+            if abs(e.knock_vx) > 1 or abs(e.knock_vy) > 1:
+                e.try_move(arena, e.knock_vx * dt, e.knock_vy * dt)
+                e.knock_vx *= 0.85  # decay
+                e.knock_vy *= 0.85
+
+            vx = ux * e.spd * 120
+            vy = uy * e.spd * 120
+
+            if e.kind == "shooter" and d < 180:
+                vx *= -0.55; vy *= -0.55
+
+            e.try_move(arena, vx*dt, vy*dt)
+
+            # Separation from other enemies (stronger for non-runners)
+            pushx = pushy = 0.0
+
+            # Different separation rules based on enemy type: runners can get
+            # closer and push weaker, other enemies need more space
+            sep = SEP_RUNNER if e.kind == "runner" else SEP_DEFAULT
+            sep_radius, sep_force = sep
+
+            if density:
+                # Down the crowd density gradient, one grid read instead of a pass over every enemy
+                pushx, pushy = self.density[sep].push(ex, ey, sep_force)
+            else:
+                for o in enemies:
+                    if o is e: continue
+                    ddx, ddy = e.x - o.x, e.y - o.y
+                    d2 = ddx*ddx + ddy*ddy
+
+                    # Use appropriate radius based on both enemy types
+                    check_radius = sep_radius if o.kind != "runner" or e.kind != "runner" else SEP_RUNNER[0]
+
+                    if 1 < d2 < (check_radius**2):
+                        ux2, uy2, dd = norm(ddx, ddy)
+                        f = (check_radius - dd) * sep_force
+                        pushx += ux2 * f
+                        pushy += uy2 * f
+
+            # Separation from player (no visual overlap)
+            if player.hp > 0:
+                pdx, pdy = e.x - player.x, e.y - player.y
+                pd2 = pdx*pdx + pdy*pdy
+                player_sep_radius = 48  # Keep enemies visually separated from player
+                if 1 < pd2 < (player_sep_radius**2):
+                    pux, puy, pdd = norm(pdx, pdy)
+                    pf = (player_sep_radius - pdd) * 3.5
+                    pushx += pux * pf
+                    pushy += puy * pf
+
+            e.try_move(arena, pushx*dt, pushy*dt)
+
+            # Walk while actually getting somewhere, idle when blocked; attacks play out first
+            if e.anim != ANIM_ATTACK or now - e.anim_t >= ANIM_ATTACK_TIME:
+                walking = abs(e.x - ex) + abs(e.y - ey) > e.spd * 36 * dt
+                e.set_anim(ANIM_WALK if walking else ANIM_IDLE, now)
+
+            # Melee contact damage with shield system, bounce-back, and auto-damage
+            if player.hp > 0 and dist2(e.x, e.y, player.x, player.y) < (22**2) and now >= e.hit_ready and player.ifr <= 0 and player.dmg_cd <= 0:
+                e.hit_ready = now + 24 / FPS  # longer cooldown for melee enemies
+                e.set_anim(ANIM_ATTACK, now)
+                player.dmg_cd = GLOBAL_DMG_CD_FR
+                player.ifr = IFRAMES_FR
+
+                # Shield absorbs melee damage (1 per hit, need 15 to deplete)
+                if player.shield > 0:
+                    player.shield = max(0, player.shield - 1)
+                else:
+                    player.hp -= e.dmg
+
+                # Bounce player away from enemy
+                kx, ky, _ = norm(player.x - e.x, player.y - e.y)
+                player.try_move(arena, kx*28, ky*28)
+
+                # BOUNCE ENEMY BACK as velocity (smooth knockback)
+                e.knock_vx = -kx * 450  # velocity, will be applied over multiple frames
+                e.knock_vy = -ky * 450
+
+                # Player auto-damages melee enemy on contact (0.5 HP via accumulator)
+                if not hasattr(e, 'melee_dmg_accum'):
+                    e.melee_dmg_accum = 0.0
+                e.melee_dmg_accum += 0.5
+                melee_dmg = 0
+                if e.melee_dmg_accum >= 1.0:
+                    melee_dmg = 1
+                    e.melee_dmg_accum -= 1.0
+                damage.shake(3.0, 10, "contact")
+                # Harder shake (and a heal, see kills below) if this finishes the enemy
+                damage.hit(e, melee_dmg, "melee", shake=(2.5, 8), kill_shake=(4.0, 12))
+
+            # Shooter bullets
+            if e.kind == "shooter":
+                if now >= e.shoot_ready and d < ENEMY_SHOOT_RANGE and player.hp > 0:
+                    e.shoot_ready = now + random.uniform(0.9, 1.5)
+                    e.set_anim(ANIM_ATTACK, now)
+                    bux, buy, _ = norm(player.x - e.x, player.y - e.y)
+                    spawn(bullets, Bullet(e.x, e.y, bux*ENEMY_BULLET_SPEED, buy*ENEMY_BULLET_SPEED,
+                                          life=ENEMY_BULLET_LIFE, owner="enemy", born=now))
+                    camera.add_shake(0.8, 6)
+
+        # Resolve this tick's damage in one pass
+        kills = self.kills = damage.resolve(enemies, camera)
+        # Bucket the survivors once per tick for next tick's spatial queries
+        self.grid.rebuild(enemies)
+        for kill in kills:
+            # Award points based on enemy type with combo multiplier
+            base_points = {"grunt": POINTS_GRUNT, "runner": POINTS_RUNNER,
+                           "shooter": POINTS_SHOOTER, "brute": POINTS_BRUTE}.get(kill.enemy.kind, 10)
+            combo_mult = 1.0 + player.combo * COMBO_MULTIPLIER
+            player.points += int(base_points * combo_mult)
+            player.combo += 1
+            player.combo_timer = COMBO_WINDOW
+
+            # Melee kills regenerate HP by 1
+            if kill.cause == "melee":
+                player.hp = min(player.maxhp, player.hp + 1)
+
+            marks.append(("blood_pool", kill.enemy.x, kill.enemy.y, 0))
+            spawn(self.corpses, Corpse(kill.enemy.x, kill.enemy.y, kill.enemy.kind, born=now))
+
+            # Chance to spawn pickup
+            e = kill.enemy
+            if random.random() < PICKUP_SPAWN_CHANCE:
+                pickup_kind = "health" if random.random() < 0.5 else "shield"
+                spawn(pickups, Pickup(e.x, e.y, pickup_kind, born=now))
+            elif random.random() < GRENADE_PICKUP_CHANCE:
+                spawn(pickups, Pickup(e.x, e.y, "grenade", born=now))
+        self.lap("enemies")
+
+        # Update combo timer
+        if player.combo_timer > 0:
+            player.combo_timer -= dt
+            if player.combo_timer <= 0:
+                player.combo = 0
+
+        # Collect pickups (despawning is handled by the timer wheel)
+        for p in pickups[:]:
+            # Check player collision
+            if dist2(p.x, p.y, player.x, player.y) < PICKUP_RADIUS**2:
+                if p.kind == "health":
+                    player.hp = min(player.maxhp, player.hp + HEALTH_PICKUP_AMOUNT)
+                elif p.kind == "shield":
+                    player.shield = min(player.max_shield, player.shield + SHIELD_PICKUP_AMOUNT)
+                elif p.kind == "grenade":
+                    player.grenades += 1  # No max limit, let player stock up
+                p.expired = True
+                pickups.remove(p)
+
+        # Stim pack auto-revive system
+        if player.hp <= 0 and player.stims_used < MAX_STIMS:
+            player.stims_used += 1
+            player.hp = player.maxhp
+            player.shield = player.max_shield
+            player.ifr = 60  # brief invincibility after revive
+            camera.add_shake(8.0, 20)  # big shake on revive
+
+        # Camera follow
+        camera.update(player.x - W/2, player.y - H/2)
+
+    def counts(self):
+        """Live object counts (perf overlay)"""
+        return {"enemies": len(self.enemies), "bullets": len(self.bullets), "pickups": len(self.pickups),
+                "corpses": len(self.corpses), "explosions": len(self.explosions), "vfx": len(self.vfx),
+                "timers": len(self.timers)}
+
+    def scene(self):
+        """The latest tick as the renderer sees it
+
+        Rows are (x, y, kind, phase): bullets kind 0 = player / 1 = enemy;
+        pickups kind indexes PICKUP_KINDS, phase = seconds left; enemies
+        kind is anim_code(kind, state) and phase the state's start time;
+        corpses kind indexes ENEMY_KINDS, phase = time of death; vfx kind
+        indexes VFX_KINDS and phase is the animation frame, as it is for
+        explosions.
+        """
+        now = self.now
+        return Scene(
+            now, self.camera, self.player, self.director.wave, self.director.state,
+            [(b.x, b.y, 0 if b.owner == "player" else 1, 0) for b in self.bullets],
+            [(p.x, p.y, PICKUP_KINDS.index(p.kind), p.born + p.life - now) for p in self.pickups],
+            [(e.x, e.y, anim_code(e.kind, e.anim), e.anim_t) for e in self.enemies],
+            [(c.x, c.y, ENEMY_KINDS.index(c.kind), c.born) for c in self.corpses],
+            [(v.x, v.y, VFX_KINDS.index(v.kind), v.frame(now)) for v in self.vfx],
+            [(x.x, x.y, 0, x.frame(now)) for x in self.explosions],
+            self.marks, self.counts())
@@ -0,0 +1,291 @@
+"""
+Simulation process for Hive City Rampage
+Runs sim.Game in its own process and publishes each tick through a double-buffered shared memory snapshot
+"""
+
+import multiprocessing as mp
+import struct
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+from constants import FPS, SIM_MAX_ROWS
+from mapfile import arena_to_bytes, arena_from_bytes
+from sim import Game, Controls, Scene, NO_INPUT, DECAL_KINDS
+from world import Camera
+
+
+# Block layout: controls (render -> sim), meta, decal mark ring, then two snapshot slots
+CONTROLS = struct.Struct("<4f2B2x")  # ax, ay, aim x, aim y, fire, grenade
+META = struct.Struct("<QIBxxx")  # marks written, run epoch, published slot
+MARK = struct.Struct("<BB2xfff")  # DECAL_KINDS index, run epoch (low byte), x, y, spread
+MARK_RING = 256
+# Slot header: tick, epoch, now, camera x, y, shake x, y,
+# player x, y, vx, vy, aim x, aim y, shoot flash, hp, maxhp, shield, max shield,
+# points, combo, grenades, stims used, wave, director state, player anim state,
+# anim start, sim ms, row counts (bullets, pickups, enemies, corpses, vfx, explosions), timers
+SLOT_HEAD = struct.Struct("<QId4f11f5iBBxxff6II")
+ROW = struct.Struct("<4f")  # x, y, kind, phase
+GROUPS = ("bullets", "pickups", "enemies", "corpses", "vfx", "explosions")
+DIRECTOR_STATES = ("build", "push", "breather", "spike")
+
+META_OFF = CONTROLS.size
+MARKS_OFF = META_OFF + META.size
+SLOTS_OFF = MARKS_OFF + MARK.size * MARK_RING
+
+
+def _slot_size(max_rows):
+    return SLOT_HEAD.size + ROW.size * max_rows
+
+
+def arena_payload(arena):
+    """Picklable description of an arena for another process"""
+    if hasattr(arena, "chunks"):
+        # Stream-mode chunks regenerate identically from the seed
+        return ("stream", arena.seed, arena.w, arena.h)
+    return ("hcra", arena_to_bytes(arena))
+
+
+def arena_from_payload(payload):
+    """Arena back from arena_payload()"""
+    if payload[0] == "stream":
+        from streaming import ChunkedArena
+        return ChunkedArena(*payload[1:])
+    return arena_from_bytes(payload[1])
+
+
+class PlayerView:
+    """Player fields the renderer reads, filled from a snapshot"""
+    __slots__ = ("x", "y", "vx", "vy", "aim", "shoot_flash", "hp", "maxhp", "shield", "max_shield",
+                 "points", "combo", "grenades", "stims_used", "anim", "anim_t")
+
+
+# -------------------- SIM SIDE --------------------
+class SnapshotWriter:
+    """Publishes Game ticks into the shared block (simulation process)"""
+    def __init__(self, buf, locks, max_rows):
+        self.buf = buf
+        self.locks = locks
+        self.max_rows = max_rows
+        self.slot = 0
+        self.tick = 0
+        self.marks = 0
+        self.epoch = 0
+
+    def controls(self):
+        """Latest input written by the renderer"""
+        ax, ay, mx, my, fire, grenade = CONTROLS.unpack_from(self.buf, 0)
+        return Controls(ax, ay, mx, my, bool(fire), bool(grenade))
+
+    def publish(self, game, sim_ms):
+        """Write the tick into the slot the renderer isn't on, then flip to it"""
+        buf = self.buf
+        for kind, x, y, spread in game.marks:
+            MARK.pack_into(buf, MARKS_OFF + MARK.size * (self.marks % MARK_RING),
+                           DECAL_KINDS.index(kind), self.epoch & 0xFF, x, y, spread)
+            self.marks += 1
+
+        scene = game.scene()
+        self.slot ^= 1
+        self.tick += 1
+        base = SLOTS_OFF + self.slot * _slot_size(self.max_rows)
+        with self.locks[self.slot]:
+            off = base + SLOT_HEAD.size
+            end = off + ROW.size * self.max_rows
+            counts = []
+            for name in GROUPS:
+                rows = getattr(scene, name)
+                n = min(len(rows), (end - off) // ROW.size)
+                for r in rows[:n]:
+                    ROW.pack_into(buf, off, *r)
+                    off += ROW.size
+                counts.append(n)
+            p, cam = scene.player, scene.camera
+            SLOT_HEAD.pack_into(
+                buf, base, self.tick, self.epoch, scene.now,
+                cam.x, cam.y, cam.frame_shake_x, cam.frame_shake_y,
+                p.x, p.y, p.vx, p.vy, p.aim[0], p.aim[1], p.shoot_flash,
+                p.hp, p.maxhp, p.shield, p.max_shield,
+                p.points, p.combo, p.grenades, p.stims_used, scene.wave,
+                DIRECTOR_STATES.index(scene.state), p.anim, p.anim_t, sim_ms, *counts, len(game.timers))
+        META.pack_into(buf, META_OFF, self.marks, self.epoch, self.slot)
+
+
+def _run(name, locks, conn, max_rows):
+    """Simulation process: tick at FPS, take restarts and settings from conn, publish every tick"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        writer = SnapshotWriter(shm.buf, locks, max_rows)
+        msg = conn.recv()
+        if msg is None:
+            return
+        game = Game(arena_from_payload(msg[1]))
+        writer.epoch = msg[0]
+        period = 1.0 / FPS
+        last = time.perf_counter()
+        next_t = last + period
+        while True:
+            while conn.poll():
+                msg = conn.recv()
+                if msg is None:
+                    return
+                if msg[0] == "crowd":
+                    game.crowd_solver = msg[1]
+                    continue
+                game.reset(arena_from_payload(msg[1]))
+                writer.epoch = msg[0]
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            t0 = time.perf_counter()
+            # Same dt the render loop's clock would give: wall time, capped like a hitch
+            dt = min(t0 - last, 0.1)
+            last = t0
+            next_t = max(next_t + period, t0)
+            game.step(dt, writer.controls())
+            writer.publish(game, (time.perf_counter() - t0) * 1000.0)
+    finally:
+        shm.close()
+
+
+# -------------------- RENDER SIDE --------------------
+class SimProcess:
+    """Render-side handle on a simulation running in its own process
+
+    The shared block holds the controls the renderer writes each frame,
+    a ring of decal marks and two snapshot slots. The simulation writes
+    each tick into the slot not last published and then flips the
+    published index, so the renderer always finds a complete tick; each
+    slot has a lock, held by the writer while filling it and by the
+    renderer from acquire() to release() while it reads it in place
+    (rows are struct.iter_unpack views over the shared buffer, nothing
+    is copied out). The two only contend if the simulation laps the
+    renderer by a whole tick.
+    """
+    def __init__(self, arena, max_rows=SIM_MAX_ROWS):
+        self.max_rows = max_rows
+        size = SLOTS_OFF + 2 * _slot_size(max_rows)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.buf = self.shm.buf  # new blocks are zero-filled
+        # spawn, not fork: the parent already holds an SDL window
+        ctx = mp.get_context("spawn")
+        self.locks = (ctx.Lock(), ctx.Lock())
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_run, args=(self.shm.name, self.locks, child, max_rows), daemon=True)
+        self.proc.start()
+        self.epoch = 0
+        self.marks = 0
+        self.held = None
+        self.views = []
+        self.groups = []  # row iterators over views, handed out with the acquired tick
+        self.camera = Camera()
+        self.player = PlayerView()
+        self.restart(arena)
+
+    def restart(self, arena):
+        """Start a new run on arena; scenes of the old run are skipped from here on"""
+        self.epoch += 1
+        self.conn.send((self.epoch, arena_payload(arena)))
+
+    def set_crowd_solver(self, solver):
+        """Switch the simulation's enemy separation (sim.CROWD_SOLVERS) from its next tick"""
+        self.conn.send(("crowd", solver))
+
+    def send(self, controls):
+        """Hand this frame's input to the simulation"""
+        CONTROLS.pack_into(self.buf, 0, controls.ax, controls.ay, controls.aim_x, controls.aim_y,
+                           controls.fire, controls.grenade)
+
+    def acquire(self, timeout=2.0):
+        """Latest published tick as a Scene, read in place until release()
+
+        Waits (up to timeout seconds) for the first tick of the current run.
+        """
+        buf = self.buf
+        deadline = time.perf_counter() + timeout
+        while True:
+            marks, epoch, slot = META.unpack_from(buf, META_OFF)
+            if epoch == self.epoch or time.perf_counter() > deadline:
+                break
+            if not self.proc.is_alive():
+                raise RuntimeError("simulation process exited")
+            time.sleep(0.001)
+        lock = self.locks[slot]
+        lock.acquire()
+        self.held = lock
+        try:
+            return self._read(buf, slot, marks)
+        except BaseException:
+            self.release()
+            raise
+
+    def _read(self, buf, slot, marks):
+        """Scene over the locked slot (acquire())"""
+        base = SLOTS_OFF + slot * _slot_size(self.max_rows)
+        (_, _, now, cx, cy, sx, sy,
+         px, py, pvx, pvy, aimx, aimy, flash, hp, maxhp, shield, max_shield,
+         points, combo, grenades, stims, wave, state, anim, anim_t, sim_ms,
+         nb, np_, ne, nc, nv, nx, timers) = SLOT_HEAD.unpack_from(buf, base)
+        cam = self.camera
+        cam.x, cam.y, cam.frame_shake_x, cam.frame_shake_y = cx, cy, sx, sy
+        p = self.player
+        p.x, p.y, p.vx, p.vy, p.aim, p.shoot_flash = px, py, pvx, pvy, (aimx, aimy), flash
+        p.hp, p.maxhp, p.shield, p.max_shield = hp, maxhp, shield, max_shield
+        p.points, p.combo, p.grenades, p.stims_used = points, combo, grenades, stims
+        p.anim, p.anim_t = anim, anim_t
+
+        groups = self.groups
+        off = base + SLOT_HEAD.size
+        for n in (nb, np_, ne, nc, nv, nx):
+            end = off + ROW.size * n
+            view = buf[off:end]
+            self.views.append(view)
+            groups.append(struct.iter_unpack(ROW.format, view))
+            off = end
+
+        # Decal marks since the last frame (older ones are gone if the ring lapped),
+        # minus any the previous run left after a restart
+        new = []
+        for i in range(max(self.marks, marks - MARK_RING), marks):
+            kind, run, x, y, spread = MARK.unpack_from(buf, MARKS_OFF + MARK.size * (i % MARK_RING))
+            if run == self.epoch & 0xFF:
+                new.append((DECAL_KINDS[kind], x, y, spread))
+        self.marks = marks
+
+        counts = {"enemies": ne, "bullets": nb, "pickups": np_, "corpses": nc, "explosions": nx, "vfx": nv,
+                  "timers": timers, "sim ms": f"{sim_ms:.2f}"}
+        return Scene(now, cam, p, wave, DIRECTOR_STATES[state], *groups, new, counts)
+
+    def release(self):
+        """Done reading the acquired tick; the slot lock is freed even if reading stopped early"""
+        try:
+            # A row iterator holds its view until exhausted, wherever else it's referenced
+            for rows in self.groups:
+                deque(rows, maxlen=0)
+            self.groups.clear()
+            kept = []
+            for view in self.views:
+                try:
+                    view.release()
+                except BufferError:
+                    kept.append(view)  # exported elsewhere, retried next time
+            self.views[:] = kept
+        finally:
+            if self.held is not None:
+                self.held.release()
+                self.held = None
+
+    def close(self):
+        """Stop the simulation and free the shared block"""
+        self.release()
+        self.send(NO_INPUT)
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.proc.join(1.0)
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,244 @@
+"""
+Soak test for Hive City Rampage
+Drives the simulation headless for a wall-clock duration and flags memory growth and tick-time drift
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import struct
+import sys
+import time
+
+from constants import FPS, SOAK_SAMPLE_INTERVAL, SOAK_RUN_TIME, SOAK_LOG
+from world import new_arena
+from entities import Player, Enemy, Bullet, Pickup, Corpse, Explosion, VFX
+from sim import Game, Controls
+from batch import ScriptedPlayer
+
+
+# One recorded frame: dt, then the Controls fields
+INPUT = struct.Struct("<f4f2B2x")
+ENTITY_CLASSES = (Player, Enemy, Bullet, Pickup, Corpse, Explosion, VFX)
+# Next to the game, not the working directory (where .gitignore expects it)
+LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), SOAK_LOG)
+
+
+# -------------------- RECORDED INPUT --------------------
+class InputRecorder:
+    """Appends each frame's dt and Controls to a binary file (INPUT_RECORD in the game)"""
+    def __init__(self, path):
+        self.f = open(path, "wb")
+
+    def write(self, dt, c):
+        self.f.write(INPUT.pack(dt, c.ax, c.ay, c.aim_x, c.aim_y, c.fire, c.grenade))
+
+    def close(self):
+        self.f.close()
+
+
+def load_inputs(path):
+    """Recorded frames as a list of (dt, Controls)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return [(dt, Controls(ax, ay, mx, my, bool(fire), bool(gren)))
+            for dt, ax, ay, mx, my, fire, gren in INPUT.iter_unpack(data[:len(data) - len(data) % INPUT.size])]
+
+
+# -------------------- SAMPLING --------------------
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def object_counts():
+    """Live instances of each entity class, reachable from anywhere"""
+    counts = dict.fromkeys((c.__name__ for c in ENTITY_CLASSES), 0)
+    for o in gc.get_objects():
+        if type(o) in ENTITY_CLASSES:
+            counts[type(o).__name__] += 1
+    return counts
+
+
+def container_sizes(game):
+    """Lengths of the game's long-lived containers"""
+    sizes = {"enemies": len(game.enemies), "bullets": len(game.bullets), "pickups": len(game.pickups),
+             "corpses": len(game.corpses), "explosions": len(game.explosions), "vfx": len(game.vfx), "timers": len(game.timers),
+             "damage_hits": len(game.damage.hits), "timer_slots": sum(
+                 len(slot) for wheel in game.timers.wheels for slot in wheel)}
+    chunks = getattr(game.arena, "chunks", None)
+    if chunks is not None:
+        sizes["chunks"] = len(chunks)
+    return sizes
+
+
+class Soak:
+    """Plays back-to-back headless runs for a wall-clock duration, sampling as it goes
+
+    Each run lasts until the player is out of stims or run_time game
+    seconds pass, then restarts on the next seed. Every sample_every wall
+    seconds (and right after every restart, following a gc.collect()) it
+    records RSS, entity instance counts, container sizes and the mean /
+    worst tick time since the previous sample. Restart samples all see an
+    empty game, so they are what the leak check compares; per-run mean
+    tick times are what the drift check compares.
+    """
+    def __init__(self, duration, inputs=None, sample_every=SOAK_SAMPLE_INTERVAL,
+                 run_time=SOAK_RUN_TIME, seed=0, log=LOG_PATH):
+        self.duration = duration
+        self.inputs = inputs
+        self.sample_every = sample_every
+        self.run_time = run_time
+        self.seed = seed
+        self.log_path = log
+        self.samples = []
+        self.run_ticks = []  # mean tick ms of each finished run
+
+    def _new_game(self, seed):
+        arena = new_arena(seed)
+        random.seed(seed)
+        return Game(arena), ScriptedPlayer(seed)
+
+    def _sample(self, game, t0, tick_ms, restart, log):
+        s = {
+            "t": round(time.perf_counter() - t0, 2), "restart": restart, "run": self.seed,
+            "wave": game.director.wave, "rss": rss_bytes(), "objects": object_counts(),
+            "containers": container_sizes(game),
+            "tick_ms": statistics.fmean(tick_ms) if tick_ms else 0.0,
+            "tick_max_ms": max(tick_ms) if tick_ms else 0.0,
+        }
+        self.samples.append(s)
+        if log:
+            log.write(json.dumps(s) + "\n")
+            log.flush()
+
+    def run(self):
+        """Soak until the duration is up; returns the samples"""
+        log = open(self.log_path, "w") if self.log_path else None
+        t0 = time.perf_counter()
+        end = t0 + self.duration
+        next_sample = t0 + self.sample_every
+        game, bot = self._new_game(self.seed)
+        gc.collect()
+        self._sample(game, t0, [], True, log)
+        window, run_ms, played, frame = [], [], 0.0, 0
+        try:
+            while True:
+                if self.inputs:
+                    dt, controls = self.inputs[frame % len(self.inputs)]
+                    frame += 1
+                else:
+                    dt, controls = 1.0 / FPS, bot(game)
+                ts = time.perf_counter()
+                game.step(dt, controls)
+                now = time.perf_counter()
+                ms = (now - ts) * 1000.0
+                window.append(ms)
+                run_ms.append(ms)
+                played += dt
+
+                run_over = game.player.hp <= 0 or played >= self.run_time
+                if run_over:
+                    # Only whole runs count towards drift: a cut-off one has fewer enemies
+                    self.run_ticks.append(statistics.fmean(run_ms))
+                if now >= end:
+                    self._sample(game, t0, window, False, log)
+                    break
+                if run_over:
+                    self.seed += 1
+                    game, bot = self._new_game(self.seed)
+                    run_ms, played = [], 0.0
+                    gc.collect()
+                    self._sample(game, t0, window, True, log)
+                    window = []
+                    next_sample = time.perf_counter() + self.sample_every
+                elif now >= next_sample:
+                    self._sample(game, t0, window, False, log)
+                    window = []
+                    next_sample = now + self.sample_every
+        finally:
+            if log:
+                log.close()
+        return self.samples
+
+
+# -------------------- REPORT --------------------
+def _growth(series, rel_tol, abs_tol):
+    """Flag if a series keeps rising: mostly non-decreasing and clearly above where it started"""
+    if len(series) < 4:
+        return None
+    ups = sum(b >= a for a, b in zip(series, series[1:])) / (len(series) - 1)
+    grew = series[-1] - series[0] > max(abs_tol, abs(series[0]) * rel_tol)
+    return ups >= 0.8 and grew
+
+
+def report(soak, warmup=2, drift_tol=0.25):
+    """Text report of a finished soak, and whether anything was flagged
+
+    Leak check: RSS, entity counts and container sizes at each restart
+    (skipping the first warmup restarts while caches fill). Drift check:
+    mean tick time of the last third of runs against the first third.
+    """
+    starts = [s for s in soak.samples if s["restart"]][warmup:]
+    lines = [f"Soak: {soak.samples[-1]['t'] / 60:.1f} min, {len(soak.run_ticks)} runs, "
+             f"{len(soak.samples)} samples"]
+    flagged = False
+    if len(starts) < 4:
+        lines.append(f"  leak check skipped: only {len(starts)} restarts after warmup (need 4)")
+    else:
+        series = {"rss": [s["rss"] for s in starts]}
+        for group in ("objects", "containers"):
+            for name in starts[-1][group]:
+                series[f"{group}.{name}"] = [s[group].get(name, 0) for s in starts]
+        for name, vals in series.items():
+            rss = name == "rss"
+            grow = _growth(vals, 0.10 if rss else 0.0, 8 * 2**20 if rss else 0)
+            shown = (f"{vals[0] / 2**20:.1f} -> {vals[-1] / 2**20:.1f} MiB" if rss else f"{vals[0]} -> {vals[-1]}")
+            if grow:
+                flagged = True
+                lines.append(f"  GROWTH  {name:<24} {shown} over {len(vals)} restarts")
+            elif rss or vals[-1]:
+                lines.append(f"  ok      {name:<24} {shown}")
+
+    runs = soak.run_ticks
+    if len(runs) < 3:
+        lines.append(f"  drift check skipped: only {len(runs)} runs (need 3)")
+    else:
+        third = len(runs) // 3
+        first, last = statistics.fmean(runs[:third]), statistics.fmean(runs[-third:])
+        drift = last / first - 1 if first > 0 else 0.0
+        tag = "DRIFT " if drift > drift_tol else "ok    "
+        flagged |= drift > drift_tol
+        lines.append(f"  {tag}  {'tick time':<24} {first:.3f} -> {last:.3f} ms/tick per run ({drift:+.0%})")
+    worst = max(s["tick_max_ms"] for s in soak.samples)
+    lines.append(f"  worst tick {worst:.1f} ms")
+    lines.append("FLAGGED" if flagged else "No growth or drift flagged")
+    return "\n".join(lines), flagged
+
+
+if __name__ == "__main__":
+    # python soak.py --minutes 60 [--inputs recorded.bin] [--seed S]
+    ap = argparse.ArgumentParser(description="Headless soak test with leak and drift detection")
+    ap.add_argument("--minutes", type=float, default=60.0, help="wall-clock duration")
+    ap.add_argument("--inputs", help="replay (and loop) a recording made with INPUT_RECORD")
+    ap.add_argument("--seed", type=int, default=0, help="first run's seed (later runs count up)")
+    ap.add_argument("--interval", type=float, default=SOAK_SAMPLE_INTERVAL, help="seconds between samples")
+    ap.add_argument("--run-time", type=float, default=SOAK_RUN_TIME, help="game seconds per run")
+    args = ap.parse_args()
+
+    soak = Soak(args.minutes * 60, load_inputs(args.inputs) if args.inputs else None,
+                args.interval, args.run_time, args.seed)
+    soak.run()
+    text, flagged = report(soak)
+    print(text)
+    print(f"Samples written to {soak.log_path}")
+    sys.exit(1 if flagged else 0)
@@ -0,0 +1,141 @@
+"""
+Spatial hashing for Hive City Rampage
+Uniform grids over entity positions: buckets for bounded radius and cone queries, density for crowd separation
+"""
+
+import math
+
+from constants import SPATIAL_CELL
+
+
+class SpatialGrid:
+    """Entities bucketed by square cell of side cell px
+
+    rebuild() is one dict append per entity. Queries only visit the cells
+    overlapping the query circle, nearest first, and stop after budget
+    entities have been examined, so their cost doesn't grow with the
+    total entity count.
+    """
+    def __init__(self, cell=SPATIAL_CELL):
+        self.cell = cell
+        self.cells = {}  # (cx, cy) -> [entity, ...]
+
+    def rebuild(self, items):
+        """Re-bucket items (anything with x, y)"""
+        cells = self.cells
+        cells.clear()
+        s = self.cell
+        for o in items:
+            key = (int(o.x // s), int(o.y // s))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [o]
+            else:
+                bucket.append(o)
+
+    def _cells_near(self, x, y, r):
+        """Occupied cells overlapping the circle, as (distance to cell center, cx, cy), nearest first"""
+        s = self.cell
+        cells = self.cells
+        x0, x1 = int((x - r) // s), int((x + r) // s)
+        y0, y1 = int((y - r) // s), int((y + r) // s)
+        if len(cells) < (x1 - x0 + 1) * (y1 - y0 + 1):
+            # Sparse: fewer occupied cells than cells in the window
+            keys = [k for k in cells if x0 <= k[0] <= x1 and y0 <= k[1] <= y1]
+        else:
+            keys = [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1) if (cx, cy) in cells]
+        out = [(math.hypot((cx + 0.5) * s - x, (cy + 0.5) * s - y), cx, cy) for cx, cy in keys]
+        out.sort()
+        return out
+
+    def query_radius(self, x, y, r, budget=None):
+        """Entities within r of x, y (nearest cells first, at most budget examined)"""
+        r2 = r * r
+        found = []
+        seen = 0
+        for _, cx, cy in self._cells_near(x, y, r):
+            for o in self.cells[(cx, cy)]:
+                if budget is not None and seen >= budget:
+                    return found
+                seen += 1
+                dx, dy = o.x - x, o.y - y
+                if dx*dx + dy*dy <= r2:
+                    found.append(o)
+        return found
+
+    def query_cone(self, x, y, fx, fy, r, min_cos, budget=None):
+        """Entities within r of x, y whose direction has cosine >= min_cos with unit vector fx, fy
+
+        Cells entirely outside the cone (by their bounding circle) are
+        skipped without looking at their contents.
+        """
+        r2 = r * r
+        half = self.cell * 0.7072  # cell half-diagonal
+        cone = math.acos(max(-1.0, min(1.0, min_cos)))
+        found = []
+        seen = 0
+        s = self.cell
+        for dc, cx, cy in self._cells_near(x, y, r + half):
+            if dc > half:
+                # Angle to the cell center minus the cell's angular radius
+                dot = (((cx + 0.5) * s - x) * fx + ((cy + 0.5) * s - y) * fy) / dc
+                if math.acos(max(-1.0, min(1.0, dot))) - math.asin(half / dc) > cone:
+                    continue
+            for o in self.cells[(cx, cy)]:
+                if budget is not None and seen >= budget:
+                    return found
+                seen += 1
+                dx, dy = o.x - x, o.y - y
+                d2 = dx*dx + dy*dy
+                if d2 <= r2 and dx*fx + dy*fy >= min_cos * math.sqrt(d2):
+                    found.append(o)
+        return found
+
+
+class DensityField:
+    """Entities splatted into a coarse density grid, for crowd separation without pairwise distances
+
+    rebuild() spreads each entity over the four grid nodes around it
+    (bilinear weights, cell = radius / 2, so two entities only feel each
+    other within about radius). push() reads the density gradient at an
+    entity's own rebuild position from those same four nodes, with the
+    entity's own weights taken out, so a whole crowd costs
+    O(entities + occupied cells) however tightly it is packed.
+    """
+    GAIN = 4.0  # matches the mean pairwise push, (radius - d) * force, over neighbors within radius
+
+    def __init__(self, radius):
+        self.radius = radius
+        self.cell = radius / 2
+        self.nodes = {}  # (nx, ny) -> summed weight
+
+    def rebuild(self, items):
+        """Re-splat items (anything with x, y)"""
+        nodes = self.nodes
+        nodes.clear()
+        get = nodes.get
+        inv = 1.0 / self.cell
+        for o in items:
+            gx, gy = o.x * inv, o.y * inv
+            nx, ny = math.floor(gx), math.floor(gy)
+            fx, fy = gx - nx, gy - ny
+            for key, w in (((nx, ny), (1 - fx) * (1 - fy)), ((nx + 1, ny), fx * (1 - fy)),
+                           ((nx, ny + 1), (1 - fx) * fy), ((nx + 1, ny + 1), fx * fy)):
+                nodes[key] = get(key, 0.0) + w
+
+    def push(self, x, y, force):
+        """Separation push (px/s) for the entity splatted at x, y, down the density of all the others"""
+        nodes = self.nodes
+        s = self.cell
+        gx, gy = x / s, y / s
+        nx, ny = math.floor(gx), math.floor(gy)
+        fx, fy = gx - nx, gy - ny
+        # Node densities minus this entity's own share
+        d00 = nodes.get((nx, ny), 0.0) - (1 - fx) * (1 - fy)
+        d10 = nodes.get((nx + 1, ny), 0.0) - fx * (1 - fy)
+        d01 = nodes.get((nx, ny + 1), 0.0) - (1 - fx) * fy
+        d11 = nodes.get((nx + 1, ny + 1), 0.0) - fx * fy
+        # -gradient of the bilinear density, in density per cell
+        k = force * s * self.GAIN
+        return (k * ((1 - fy) * (d00 - d10) + fy * (d01 - d11)),
+                k * ((1 - fx) * (d00 - d01) + fx * (d10 - d11)))
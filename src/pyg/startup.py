@@ -0,0 +1,54 @@
+"""
+Startup benchmark for Hive City Rampage
+Times cold starts from process launch to the first frame on screen
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+GAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hive_city_rampage.py")
+
+
+def time_to_first_frame(cmd, timeout=60.0):
+    """Seconds from launching cmd until the game reports its first frame
+
+    cmd is run with --first-frame, so it quits right after that frame;
+    everything before it (interpreter start, imports, pygame init, asset
+    loading, arena generation) is counted. Worker processes only start
+    after the first frame, so a timed launch runs the game alone.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([*cmd, "--first-frame"], stdout=subprocess.PIPE, text=True)
+    try:
+        for line in proc.stdout:
+            if line.startswith("first frame"):
+                return time.perf_counter() - t0
+    finally:
+        proc.communicate(timeout=timeout)  # drain: spawned workers share the pipe until they exit
+    raise RuntimeError(f"{cmd[0]} exited without showing a frame")
+
+
+def bench(cmd, runs=5):
+    """Time runs launches of cmd; returns the list of seconds (the first is the coldest)"""
+    return [time_to_first_frame(cmd) for _ in range(runs)]
+
+
+if __name__ == "__main__":
+    # python startup.py [--runs N] [--exe dist/HiveCityRampage/HiveCityRampage]
+    ap = argparse.ArgumentParser(description="Measure time to first frame")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--exe", help="packaged build to time (default: this source tree)")
+    args = ap.parse_args()
+
+    cmd = [args.exe] if args.exe else [sys.executable, GAME]
+    times = bench(cmd, args.runs)
+    print(f"{' '.join(cmd)}: first run {times[0] * 1000:.0f} ms")
+    if len(times) > 1:
+        rest = times[1:]
+        print(f"  later runs: median {statistics.median(rest) * 1000:.0f} ms, "
+              f"min {min(rest) * 1000:.0f} ms, max {max(rest) * 1000:.0f} ms")
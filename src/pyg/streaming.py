@@ -0,0 +1,262 @@
+"""
+Chunked streaming world for Hive City Rampage
+Generates the corridor/room grid on demand around the player and keeps chunks in an LRU
+"""
+
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+from constants import TILE, SAFE_SPAWN_DIST, STREAM_WORLD_W, STREAM_WORLD_H
+from constants import STREAM_CHUNK, STREAM_RADIUS, STREAM_MAX_CHUNKS
+from utils import dist2
+from world import HALL_WIDTH, ROOM_SPACING_X, ROOM_SPACING_Y, PROP_ROOM_TYPES, CORRIDOR_PROPS
+from arena_np import room_props, corridor_prop_mask, tile_masks, scatter_layers, SPARSE_LAYERS, _pick
+from tracing import span
+
+
+# Tiles generated around a chunk so rooms and wall masks crossing its edge come out whole
+# (a room reaches at most 12 tiles past its grid point)
+APRON = 16
+
+_MASK64 = (1 << 64) - 1
+
+
+def _key(*parts):
+    """Stable 64-bit hash of a few integers (splitmix64 steps)"""
+    h = 0x9E3779B97F4A7C15
+    for p in parts:
+        h = ((h ^ (p & _MASK64)) * 0xBF58476D1CE4E5B9) & _MASK64
+        h ^= h >> 31
+        h = (h * 0x94D049BB133111EB) & _MASK64
+        h ^= h >> 29
+    return h
+
+
+class Chunk:
+    """One resident square of the map
+
+    Grids (solid, variants, masks) are indexed chunk-locally as [ly][lx];
+    sparse layers and floor use map tile coordinates like Arena's.
+    """
+    def __init__(self, cx, cy, size):
+        self.cx, self.cy = cx, cy
+        self.ox, self.oy = cx * size, cy * size
+        self.w = self.h = size
+        self.solid = []
+        self.wall_variants = []
+        self.floor_variants = []
+        self.interior = []
+        self.neighbor_masks = []
+        self.floor = []
+        self.wall_elements = {}
+        self.tile_decals = {}
+        self.hazard_tiles = {}
+        self.animated_tiles = {}
+        self.props = {}
+
+    def is_interior_wall(self, lx, ly):
+        """Wall with no floor in its 8-neighborhood (chunk-local coords)"""
+        return self.interior[ly][lx]
+
+    def get_neighbor_mask(self, lx, ly):
+        """Cardinal floor mask N=1, E=2, S=4, W=8 (chunk-local coords)"""
+        return self.neighbor_masks[ly][lx]
+
+
+class ChunkedArena:
+    """Arena-compatible world generated chunk by chunk
+
+    Uses Arena's corridor grid and room rules, but every random choice is
+    keyed by (seed, grid line / grid cell / chunk), so any chunk can be built
+    on its own and comes out identical whenever it is regenerated. Only
+    chunks within STREAM_RADIUS of the player plus an LRU of recently visited
+    ones stay resident; collision, spawning and rendering only see those.
+
+    The global L-shaped link corridors of Arena are skipped: the corridor
+    grid already runs through every room.
+    """
+    def __init__(self, seed=None, w=None, h=None):
+        random.seed(seed)
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.w = w or STREAM_WORLD_W
+        self.h = h or STREAM_WORLD_H
+        self.size = STREAM_CHUNK
+        self.radius = STREAM_RADIUS
+        self.max_chunks = max(STREAM_MAX_CHUNKS, (2*STREAM_RADIUS + 1)**2)
+        self.chunks = OrderedDict()  # (cx, cy) -> Chunk, least recently used first
+        self.center = None
+        # Animated tiles arrive per chunk through stream(); nothing up front
+        self.animated_tiles = {}
+
+    # -------------------- RESIDENCY --------------------
+    def stream(self, px, py):
+        """Make the chunks around a position resident
+
+        Returns (loaded, evicted) chunk lists; both are empty while the
+        position stays in the same chunk.
+        """
+        s = self.size
+        center = (int(px // TILE) // s, int(py // TILE) // s)
+        if center == self.center:
+            return (), ()
+        self.center = center
+
+        loaded = []
+        r = self.radius
+        for cy in range(max(0, center[1] - r), min((self.h - 1) // s, center[1] + r) + 1):
+            for cx in range(max(0, center[0] - r), min((self.w - 1) // s, center[0] + r) + 1):
+                c = self.chunks.get((cx, cy))
+                if c is None:
+                    c = self.chunks[(cx, cy)] = self._generate(cx, cy)
+                    loaded.append(c)
+                else:
+                    self.chunks.move_to_end((cx, cy))
+
+        evicted = []
+        while len(self.chunks) > self.max_chunks:
+            evicted.append(self.chunks.popitem(last=False)[1])
+        return loaded, evicted
+
+    def is_resident_px(self, px, py):
+        """True if pixel coordinates fall in a resident chunk"""
+        s = self.size * TILE
+        return (int(px // s), int(py // s)) in self.chunks
+
+    def regions(self, x0, y0, x1, y1):
+        """Yield (chunk, ox, oy) for resident chunks overlapping a tile window"""
+        s = self.size
+        for cy in range(max(0, y0) // s, (min(y1, self.h) - 1) // s + 1):
+            for cx in range(max(0, x0) // s, (min(x1, self.w) - 1) // s + 1):
+                c = self.chunks.get((cx, cy))
+                if c is not None:
+                    yield c, c.ox, c.oy
+
+    # -------------------- QUERIES --------------------
+    def is_solid_px(self, px, py):
+        """Check if pixel coordinates are solid (non-resident chunks are solid)"""
+        tx, ty = int(px // TILE), int(py // TILE)
+        if tx < 0 or ty < 0 or tx >= self.w or ty >= self.h:
+            return True
+        s = self.size
+        c = self.chunks.get((tx // s, ty // s))
+        if c is None:
+            return True
+        return c.solid[ty - c.oy][tx - c.ox] == 1
+
+    def rand_floor_far(self, px, py, min_d=SAFE_SPAWN_DIST):
+        """Find a random resident floor tile far from given position"""
+        chunks = [c for c in self.chunks.values() if c.floor]
+        if not chunks:
+            return px, py
+        min_d2 = min_d * min_d
+        best = None
+        bestd = -1
+        for _ in range(140):
+            tx, ty = random.choice(random.choice(chunks).floor)
+            fx, fy = tx*TILE + TILE/2, ty*TILE + TILE/2
+            d = dist2(fx, fy, px, py)
+            if d >= min_d2:
+                return fx, fy
+            if d > bestd:
+                bestd = d
+                best = (fx, fy)
+        return best if best else (px, py)
+
+    # -------------------- GENERATION --------------------
+    def _line_offset(self, axis, i):
+        """Deterministic -1..1 offset of corridor grid line i"""
+        return _key(self.seed, axis, i) % 3 - 1
+
+    def _generate(self, cx, cy):
+        """Build one chunk from a window of the map with an APRON margin"""
+        with span("ChunkedArena._generate", "arena"):
+            return self._build(cx, cy)
+
+    def _build(self, ccx, ccy):
+        s, W, H = self.size, self.w, self.h
+        chunk = Chunk(ccx, ccy, s)
+        ox, oy = chunk.ox, chunk.oy
+        wx0, wy0 = ox - APRON, oy - APRON
+        n = s + 2*APRON
+        solid = np.ones((n, n), dtype=np.uint8)
+
+        def carve(x0, y0, x1, y1):
+            # Map rectangle [x0, x1) x [y0, y1) into the window
+            lx0, ly0 = max(0, x0 - wx0), max(0, y0 - wy0)
+            lx1, ly1 = min(n, x1 - wx0), min(n, y1 - wy0)
+            if lx0 < lx1 and ly0 < ly1:
+                solid[ly0:ly1, lx0:lx1] = 0
+
+        # Corridor grid lines crossing the window
+        for i in range(max(0, (wy0 - 3 - HALL_WIDTH) // ROOM_SPACING_Y), (wy0 + n - 3) // ROOM_SPACING_Y + 2):
+            gy = 3 + i * ROOM_SPACING_Y
+            if gy >= H - 3:
+                break
+            y = gy + self._line_offset(0, i)
+            if 3 <= y <= H - 4:
+                carve(3, y, W - 3, y + HALL_WIDTH)
+        for j in range(max(0, (wx0 - 4 - HALL_WIDTH) // ROOM_SPACING_X), (wx0 + n - 4) // ROOM_SPACING_X + 2):
+            gx = 4 + j * ROOM_SPACING_X
+            if gx >= W - 4:
+                break
+            x = gx + self._line_offset(1, j)
+            if 3 <= x <= W - 5:
+                carve(x, 3, x + HALL_WIDTH, H - 3)
+
+        # Rooms of the grid cells that can reach the window, each with its own RNG
+        mx, my = W//2, H//2
+        rooms = []
+        for i in range(max(0, (wy0 - 3 - 10) // ROOM_SPACING_Y), (wy0 + n - 3) // ROOM_SPACING_Y + 2):
+            gy = 3 + i * ROOM_SPACING_Y
+            if gy >= H - 8:
+                break
+            for j in range(max(0, (wx0 - 4 - 13) // ROOM_SPACING_X), (wx0 + n - 4) // ROOM_SPACING_X + 2):
+                gx = 4 + j * ROOM_SPACING_X
+                if gx >= W - 10:
+                    break
+                rng = np.random.default_rng(_key(self.seed, 2, i, j))
+                if rng.random() >= 0.7:
+                    continue
+                rw, rh = int(rng.integers(6, 11)), int(rng.integers(5, 9))
+                rx, ry = gx + int(rng.integers(-2, 3)), gy + int(rng.integers(-1, 2))
+                carve(rx, ry, min(rx + rw, W - 2), min(ry + rh, H - 2))
+                room_type = PROP_ROOM_TYPES[int(rng.integers(0, len(PROP_ROOM_TYPES)))]
+                if abs(rx + rw//2 - mx) < 8 and abs(ry + rh//2 - my) < 6:
+                    room_type = 'command'
+                rooms.append(((rx, ry, rw, rh), room_type, rng))
+
+        # Central command room
+        carve(mx - 6, my - 5, mx + 7, my + 6)
+        rooms.append(((mx - 6, my - 5, 13, 11), 'command', np.random.default_rng(_key(self.seed, 3))))
+
+        # Props of rooms touching the chunk (room RNGs make them agree across chunks)
+        props = {}
+        for (rx, ry, rw, rh), room_type, rng in rooms:
+            if rx < ox + s and rx + rw > ox and ry < oy + s and ry + rh > oy:
+                room_props(solid, (rx, ry, rw, rh), room_type, rng, props, wx0, wy0)
+        rng = np.random.default_rng(_key(self.seed, 1, ccx, ccy))
+        core = (slice(APRON, APRON + s), slice(APRON, APRON + s))
+        py, px = np.nonzero(corridor_prop_mask(solid, rng)[core])
+        chunk.props = {k: v for k, v in props.items() if ox <= k[0] < ox + s and oy <= k[1] < oy + s}
+        for x, y, p in zip((px + ox).tolist(), (py + oy).tolist(), _pick(rng, CORRIDOR_PROPS, len(px))):
+            chunk.props.setdefault((x, y), p)
+
+        # Per-tile layers on the chunk itself (masks computed with the apron for context)
+        interior, nmask, _ = tile_masks(solid)
+        solid_c, interior_c = solid[core], interior[core]
+        layers = scatter_layers(solid_c, interior_c, rng)
+        chunk.solid = solid_c.tolist()
+        chunk.interior = interior_c.tolist()
+        chunk.neighbor_masks = nmask[core].tolist()
+        chunk.wall_variants = layers["wall_variants"].tolist()
+        chunk.floor_variants = layers["floor_variants"].tolist()
+        for name in SPARSE_LAYERS:
+            ty, tx, values = layers[name]
+            getattr(chunk, name).update(zip(zip((tx + ox).tolist(), (ty + oy).tolist()), values))
+
+        fy, fx = np.nonzero(solid_c == 0)
+        chunk.floor = [(x, y) for x, y in zip((fx + ox).tolist(), (fy + oy).tolist())
+                       if 0 < x < W - 1 and 0 < y < H - 1]
+        return chunk
@@ -0,0 +1,82 @@
+"""
+Timer wheel for Hive City Rampage
+Schedules expirations on game time so per-tick cost follows the events firing, not live objects
+"""
+
+import math
+
+
+class TimerWheel:
+    """Hierarchical timing wheel keyed on game time
+
+    Time is quantized into ticks of res seconds. Level 0 has one slot per
+    tick for the next 2**bits ticks; each higher level covers 2**bits slots
+    of the level below. When level 0 wraps, the matching slot of the next
+    level is cascaded down, so scheduling is O(1) and advancing costs one
+    slot visit per tick plus the items that fire or cascade.
+
+    Items fire on the first tick at or after their deadline (never early,
+    at most one tick late). There's no cancel: owners mark items dead and
+    ignore them when they come back.
+    """
+    def __init__(self, res, bits=6, levels=3):
+        self.res = res
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.wheels = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self.tick = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, t, item):
+        """Fire item once game time reaches t"""
+        self._insert(max(math.ceil(t / self.res - 1e-9), self.tick + 1), item)
+        self.count += 1
+
+    def _insert(self, tick, item):
+        delta = tick - self.tick
+        bits = self.bits
+        for level in range(self.levels):
+            if delta < 1 << (bits * (level + 1)) or level == self.levels - 1:
+                self.wheels[level][(tick >> (bits * level)) & self.mask].append((tick, item))
+                return
+
+    def advance(self, now):
+        """Move the wheel up to game time now and return the items that fired"""
+        fired = []
+        target = math.floor(now / self.res + 1e-9)
+        bits, mask = self.bits, self.mask
+        while self.tick < target:
+            self.tick += 1
+            tick = self.tick
+            # Cascade the higher levels whose slot starts at this tick, top down
+            level = 0
+            while level + 1 < self.levels and tick & ((1 << (bits * (level + 1))) - 1) == 0:
+                level += 1
+            for lv in range(level, 0, -1):
+                wheel = self.wheels[lv]
+                slot = (tick >> (bits * lv)) & mask
+                bucket, wheel[slot] = wheel[slot], []
+                for due, item in bucket:
+                    self._insert(due, item)
+            wheel = self.wheels[0]
+            slot = tick & mask
+            if wheel[slot]:
+                bucket, wheel[slot] = wheel[slot], []
+                for due, item in bucket:
+                    if due <= tick:
+                        fired.append(item)
+                    else:
+                        wheel[slot].append((due, item))  # past the top level's range
+        self.count -= len(fired)
+        return fired
+
+    def clear(self):
+        """Drop everything scheduled"""
+        for wheel in self.wheels:
+            for slot in wheel:
+                slot.clear()
+        self.count = 0
@@ -0,0 +1,132 @@
+"""
+Span tracing for Hive City Rampage
+Nestable timing spans kept in a ring buffer and exported as Chrome/Perfetto trace-event JSON
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from constants import TRACE_ENABLED, TRACE_CAPACITY, TRACE_SPIKE_MS, TRACE_SPIKE_COOLDOWN, TRACE_DIR
+
+
+# Next to the game, not the working directory (where .gitignore expects them)
+TRACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), TRACE_DIR)
+
+
+class _Span:
+    """Context manager recording one complete ("X") event on exit"""
+    __slots__ = ("tracer", "name", "cat", "t0")
+
+    def __init__(self, tracer, name, cat):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.t0, time.perf_counter(), self.cat)
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span returned while tracing is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Records spans into a fixed-size ring buffer
+
+    Spans are stored as complete events (start + duration), so nesting falls
+    out of time containment: a span opened inside another span on the same
+    thread shows up as its child in chrome://tracing or ui.perfetto.dev.
+    """
+    def __init__(self, capacity=TRACE_CAPACITY, enabled=TRACE_ENABLED):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)  # (name, cat, t0, t1, tid)
+        self.t0 = time.perf_counter()
+        self.spike_ms = TRACE_SPIKE_MS
+        self.last_spike_dump = -1e9
+        self.frame_no = 0
+
+    def toggle(self):
+        """Turn recording on/off"""
+        self.enabled = not self.enabled
+
+    def span(self, name, cat="frame"):
+        """Context manager timing the enclosed block"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat)
+
+    def complete(self, name, t0, t1, cat="frame"):
+        """Record a span from perf_counter timestamps t0..t1"""
+        if self.enabled:
+            self.events.append((name, cat, t0, t1, threading.get_ident()))
+
+    def end_frame(self, t0, t1):
+        """Record the enclosing frame span and dump the buffer if it breached the threshold
+
+        Returns the path of the dump written, if any.
+        """
+        if not self.enabled:
+            return None
+        self.frame_no += 1
+        self.complete("frame", t0, t1)
+        if (t1 - t0) * 1000.0 >= self.spike_ms and t1 - self.last_spike_dump >= TRACE_SPIKE_COOLDOWN:
+            return self.dump(reason=f"spike_{int((t1 - t0) * 1000.0)}ms")
+        return None
+
+    def to_chrome(self):
+        """Build the trace-event JSON object for the buffered spans"""
+        pid = os.getpid()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "hive_city_rampage"}}]
+        for tid in {ev[4] for ev in self.events}:
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                          "args": {"name": names.get(tid, str(tid))}})
+        # Parents must precede children with equal start times
+        for name, cat, t0, t1, tid in sorted(self.events, key=lambda ev: (ev[2], -ev[3])):
+            trace.append({
+                "name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (t0 - self.t0) * 1e6, "dur": (t1 - t0) * 1e6,
+            })
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump(self, path=None, reason="manual"):
+        """Write the ring buffer as Chrome trace-event JSON and return the path
+
+        Any dump restarts the spike cooldown: the frame that writes it is
+        slow because of the write, and shouldn't trigger a second dump.
+        """
+        if path is None:
+            os.makedirs(TRACE_PATH, exist_ok=True)
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(TRACE_PATH, f"trace_{stamp}_f{self.frame_no}_{reason}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+        self.last_spike_dump = time.perf_counter()
+        return path
+
+
+# Process-wide tracer, so any module can open spans without threading it through
+tracer = Tracer()
+
+
+def span(name, cat="frame"):
+    """Open a span on the process-wide tracer"""
+    return tracer.span(name, cat)
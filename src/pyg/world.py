@@ -5,8 +5,25 @@ Handles level generation, camera viewport, and collision detection
 
 import math
 import random
-from constants import TILE, WORLD_W, WORLD_H, SAFE_SPAWN_DIST
+from collections import deque
+from constants import TILE, WORLD_W, WORLD_H, SAFE_SPAWN_DIST, ARENA_GENERATOR, WORLD_MODE
 from utils import dist2
+from tracing import span
+
+
+# -------------------- GENERATOR RULES --------------------
+# Shared by Arena and arena_np.NumpyArena so both produce the same layouts
+GENERATOR_VERSION = 2  # bump when generation changes (invalidates the map cache)
+HALL_WIDTH = 3  # corridor width
+ROOM_SPACING_X = 16  # distance between vertical corridors
+ROOM_SPACING_Y = 12  # distance between horizontal corridors
+LINK_CORRIDORS = 15  # random L-shaped corridors between rooms
+PROP_ROOM_TYPES = ['command', 'storage', 'armory', 'machinery']
+STORAGE_PROPS = ['container', 'crate', 'barrel']
+CORRIDOR_PROPS = ['light_post', 'pipe_vertical', 'small_crate']
+DECAL_TYPES = ["shell_casing", "debris", "blood_pool", "oil_spill", "scorch_mark"]
+HAZARD_TYPES = ["toxic", "electric", "heat"]
+ANIM_TILE_TYPES = ["flickering_light", "steam_vent", "electrical_panel"]
 
 
 class Camera:
@@ -51,10 +68,11 @@ class Camera:
 
 class Arena:
     """Procedural level generation with rooms, hallways, and props"""
-    def __init__(self, seed=None):
+    def __init__(self, seed=None, w=None, h=None):
         random.seed(seed)
-        self.w = WORLD_W
-        self.h = WORLD_H
+        self.seed = seed
+        self.w = w or WORLD_W
+        self.h = h or WORLD_H
         self.solid = [[1] * self.w for _ in range(self.h)]
         self.floor = []
         self.wall_variants = [[0] * self.w for _ in range(self.h)]
@@ -65,8 +83,12 @@ class Arena:
         self.wall_elements = {}  # (tx,ty): element_index (0-7)
         self.props = {}  # (tx,ty): prop_type string
         self.rooms = []  # List of (x,y,w,h) room rectangles
-        self._gen()
-        self._assign_variants()
+        self.connectivity = {}  # floor component stats from _ensure_connected
+        with span("Arena", "arena"):
+            with span("Arena._gen", "arena"):
+                self._gen()
+            with span("Arena._assign_variants", "arena"):
+                self._assign_variants()
 
     def get_neighbor_mask(self, tx, ty):
         """Get 4-bit mask for cardinal neighbors (1=floor touching)
@@ -113,14 +135,41 @@ class Arena:
                 if self.solid[ty][tx] == 0:
                     self.floor.append((tx, ty))
 
+    def _floor_components(self):
+        """Group 4-connected floor tiles: {root index: [tile index, ...]}"""
+        return floor_components(self.solid, self.w, self.h)
+
+    def _ensure_connected(self):
+        """Tunnel isolated floor pockets into the rest of the map and rebuild the floor list
+
+        The random link corridors usually connect everything, but nothing
+        guaranteed it; enemies spawned in a sealed pocket could never reach
+        the player. Pockets that can't be joined are left out of self.floor.
+        """
+        with span("Arena._ensure_connected", "arena"):
+            comps = self._floor_components()
+            sizes = sorted((len(tiles) for tiles in comps.values()), reverse=True)
+            corridors, carved, unjoined = connect_components(self.solid, self.w, self.h, comps, self.carve)
+            self._rebuild_floor()
+            if unjoined:
+                self.floor = [(tx, ty) for tx, ty in self.floor if ty*self.w + tx not in unjoined]
+            self.connectivity = {
+                "components": len(comps),
+                "largest": sizes[0] if sizes else 0,
+                "isolated_tiles": sum(sizes[1:]),
+                "corridors": corridors,
+                "carved_tiles": carved,
+                "dropped_tiles": len(unjoined),
+            }
+
     def _gen(self):
         """Generate spaceship/hive city layout with hallways and rooms"""
         cx, cy = self.w//2, self.h//2
 
         # Parameters for layout
-        hall_width = 3  # corridor width
-        room_spacing_x = 16  # distance between vertical corridors
-        room_spacing_y = 12  # distance between horizontal corridors
+        hall_width = HALL_WIDTH
+        room_spacing_x = ROOM_SPACING_X
+        room_spacing_y = ROOM_SPACING_Y
 
         # Create main grid of hallways
         # Horizontal corridors
@@ -170,7 +219,7 @@ class Arena:
 
         # Add some connecting corridors to ensure connectivity
         # Connect rooms that might be isolated
-        for _ in range(15):
+        for _ in range(LINK_CORRIDORS):
             if len(self.rooms) < 2:
                 break
             r1 = random.choice(self.rooms)
@@ -187,8 +236,9 @@ class Arena:
                     if 1 < x2 + w < self.w - 1:
                         self.carve(x2 + w, ty)
 
-        self._rebuild_floor()
-        self._place_props()
+        self._ensure_connected()
+        with span("Arena._place_props", "arena"):
+            self._place_props()
 
     def _place_props(self):
         """Place interior props in rooms: computers, columns, containers, ammo"""
@@ -201,7 +251,7 @@ class Arena:
 
             # Determine room type based on position/size
             is_central = abs(rx + rw//2 - cx) < 8 and abs(ry + rh//2 - cy) < 6
-            room_type = random.choice(['command', 'storage', 'armory', 'machinery']) if not is_central else 'command'
+            room_type = random.choice(PROP_ROOM_TYPES) if not is_central else 'command'
 
             if room_type == 'command':
                 # Computer stations along walls
@@ -225,7 +275,7 @@ class Arena:
                 for y in range(ry + 1, ry + rh - 1, 2):
                     for x in range(rx + 1, rx + rw - 1, 3):
                         if self.solid[y][x] == 0 and random.random() < 0.6:
-                            self.props[(x, y)] = random.choice(['container', 'crate', 'barrel'])
+                            self.props[(x, y)] = random.choice(STORAGE_PROPS)
 
             elif room_type == 'armory':
                 # Ammo crates and weapon racks
@@ -260,7 +310,7 @@ class Arena:
                                  and self.solid[ty+dy][tx+dx] == 0)
             if neighbors_floor <= 2 and random.random() < 0.02:
                 # Corridor props
-                self.props[(tx, ty)] = random.choice(['light_post', 'pipe_vertical', 'small_crate'])
+                self.props[(tx, ty)] = random.choice(CORRIDOR_PROPS)
 
     def _assign_variants(self):
         """Randomly assign tile variants, place decals, and wall elements"""
@@ -279,18 +329,23 @@ class Arena:
                 if self.solid[ty][tx] == 0:  # Floor tiles
                     # Occasionally place decals on floor tiles
                     if random.random() < 0.05:
-                        decal_types = ["shell_casing", "debris", "blood_pool", "oil_spill", "scorch_mark"]
-                        self.tile_decals[(tx, ty)] = random.choice(decal_types)
+                        self.tile_decals[(tx, ty)] = random.choice(DECAL_TYPES)
 
                     # Occasionally place hazard tiles
                     if random.random() < 0.02:
-                        hazard_types = ["toxic", "electric", "heat"]
-                        self.hazard_tiles[(tx, ty)] = random.choice(hazard_types)
+                        self.hazard_tiles[(tx, ty)] = random.choice(HAZARD_TYPES)
 
                     # Occasionally place animated tiles
                     if random.random() < 0.03:
-                        anim_types = ["flickering_light", "steam_vent", "electrical_panel"]
-                        self.animated_tiles[(tx, ty)] = random.choice(anim_types)
+                        self.animated_tiles[(tx, ty)] = random.choice(ANIM_TILE_TYPES)
+
+    def stream(self, px, py):
+        """Chunk residency hook shared with ChunkedArena; the whole arena is always resident"""
+        return (), ()
+
+    def regions(self, x0, y0, x1, y1):
+        """Yield (layers, ox, oy) covering a tile window; an Arena is a single region"""
+        yield self, 0, 0
 
     def is_solid_px(self, px, py):
         """Check if pixel coordinates are solid"""
@@ -313,4 +368,167 @@ class Arena:
             if d > bestd:
                 bestd = d
                 best = (fx, fy)
-        return best if best else (px, py)
\ No newline at end of file
+        return best if best else (px, py)
+
+
+# -------------------- CONNECTIVITY --------------------
+class UnionFind:
+    """Disjoint sets over tile indexes (union by size, path halving)"""
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+def floor_components(solid, w, h):
+    """Union-find over 4-connected floor tiles: {root index: [tile index, ...]}"""
+    uf = UnionFind(w * h)
+    for ty in range(1, h - 1):
+        row, below = solid[ty], solid[ty + 1]
+        for tx in range(1, w - 1):
+            if row[tx] == 0:
+                i = ty*w + tx
+                if row[tx + 1] == 0:
+                    uf.union(i, i + 1)
+                if below[tx] == 0:
+                    uf.union(i, i + w)
+    comps = {}
+    for ty in range(1, h - 1):
+        row = solid[ty]
+        for tx in range(1, w - 1):
+            if row[tx] == 0:
+                i = ty*w + tx
+                comps.setdefault(uf.find(i), []).append(i)
+    return comps
+
+
+def _tunnel(solid, w, h, src, label, root):
+    """Shortest path of wall tiles from a component to any other floor
+
+    Breadth-first from every tile of the component at once; returns (path,
+    root of the floor reached) or (None, None) if nothing is reachable.
+    """
+    prev = dict.fromkeys(src)
+    queue = deque(src)
+    while queue:
+        i = queue.popleft()
+        tx, ty = i % w, i // w
+        for n, nx, ny in ((i + 1, tx + 1, ty), (i - 1, tx - 1, ty), (i + w, tx, ty + 1), (i - w, tx, ty - 1)):
+            if n in prev or not (1 <= nx < w - 1 and 1 <= ny < h - 1):
+                continue
+            if solid[ny][nx] == 0:
+                if label.get(n, root) == root:
+                    continue
+                path = []
+                while prev[i] is not None:
+                    path.append(i)
+                    i = prev[i]
+                return path, label[n]
+            prev[n] = i
+            queue.append(n)
+    return None, None
+
+
+def connect_components(solid, w, h, comps, carve):
+    """Join floor components with the shortest extra corridors, smallest first
+
+    Each pass tunnels from the smallest component to the nearest other floor
+    through walls and carves the path with carve(tx, ty), merging the two.
+    Returns (corridors carved, tiles carved, set of tile indexes that
+    couldn't be joined to anything).
+    """
+    if len(comps) <= 1:
+        return 0, 0, set()
+    members = dict(comps)
+    label = {i: root for root, tiles in comps.items() for i in tiles}
+    corridors = carved = 0
+    unjoined = set()
+    while len(members) > 1:
+        root = min(members, key=lambda r: len(members[r]))
+        src = members.pop(root)
+        path, target = _tunnel(solid, w, h, src, label, root)
+        if path is None:
+            unjoined.update(src)
+            continue
+        for i in path:
+            carve(i % w, i // w)
+        src += path
+        for i in src:
+            label[i] = target
+        members[target] += src
+        corridors += 1
+        carved += len(path)
+    return corridors, carved, unjoined
+
+
+def new_arena(seed=None, w=None, h=None):
+    """Build an arena for WORLD_MODE with the generator picked by ARENA_GENERATOR
+
+    Stream mode and "numpy" fall back to the pure Python Arena when NumPy
+    isn't installed.
+    """
+    if WORLD_MODE == "stream":
+        try:
+            from streaming import ChunkedArena
+        except ImportError:
+            pass
+        else:
+            return ChunkedArena(seed, w, h)
+    if ARENA_GENERATOR == "numpy":
+        try:
+            from arena_np import NumpyArena
+        except ImportError:
+            pass
+        else:
+            return NumpyArena(seed, w, h)
+    return Arena(seed, w, h)
+
+
+def layout_stats(arena):
+    """Summary statistics of a generated layout (for comparing generators)"""
+    tiles = arena.w * arena.h
+    nfloor = len(arena.floor)
+    edge_walls = sum(1 for ty in range(arena.h) for tx in range(arena.w)
+                     if arena.solid[ty][tx] and not arena.is_interior_wall(tx, ty))
+    return {
+        "floor_frac": nfloor / tiles,
+        "rooms_per_ktile": len(arena.rooms) * 1000 / tiles,
+        "room_area": sum(rw * rh for _, _, rw, rh in arena.rooms) / max(1, len(arena.rooms)),
+        "props_per_floor": len(arena.props) / max(1, nfloor),
+        "decals_per_floor": len(arena.tile_decals) / max(1, nfloor),
+        "hazards_per_floor": len(arena.hazard_tiles) / max(1, nfloor),
+        "anims_per_floor": len(arena.animated_tiles) / max(1, nfloor),
+        "edge_wall_frac": edge_walls / tiles,
+        "elements_per_edge": len(arena.wall_elements) / max(1, edge_walls),
+        "components": arena.connectivity.get("components", 1),
+        "isolated_frac": arena.connectivity.get("isolated_tiles", 0) / max(1, nfloor),
+    }
+
+
+if __name__ == "__main__":
+    # Floor component stats per seed: python world.py [SEEDS] [W H]
+    import sys
+
+    seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    w, h = (int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) > 3 else (None, None)
+    print("seed  components  largest  isolated  corridors  carved  dropped")
+    for seed in range(seeds):
+        c = new_arena(seed, w, h).connectivity
+        print(f"{seed:4}  {c['components']:10}  {c['largest']:7}  {c['isolated_tiles']:8}  "
+              f"{c['corridors']:9}  {c['carved_tiles']:6}  {c['dropped_tiles']:7}")